@@ -15,6 +15,8 @@ sys.path.insert(0, os.path.join(parent_dir, 'cairn_utils'))
 # Import the wrapper function and task storage
 from cairn_utils.agents.wrapper import wrapper
 from cairn_utils.task_storage import TaskStorage
+from github_utils import close_client as close_github_client
+from supported_models import close_chat_clients
 
 # Configure logging
 logging.basicConfig(
@@ -82,6 +84,10 @@ async def run_agent_task(task_id: str):
             pass
         import traceback
         logger.error(f"Traceback: {traceback.format_exc()}")
+    finally:
+        # Release pooled GitHub and LLM provider connections before the event loop closes
+        await close_github_client()
+        await close_chat_clients()
 
 def main():
     """Main worker function"""
@@ -9,27 +9,30 @@ import asyncio
 import os
 import sys
 import time
-import json
 from typing import Any, Dict, List
 
 from dotenv import load_dotenv
 
 # Fix imports
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_utils_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _utils_dir not in sys.path:
+    sys.path.append(_utils_dir)
 from agent_classes import ExplorerToolBox
 
 # Add current directory to sys.path for agent_consts
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+_agents_dir = os.path.dirname(os.path.abspath(__file__))
+if _agents_dir not in sys.path:
+    sys.path.append(_agents_dir)
 from agent_consts import STRUCTURED_EXPLORER_PROMPT, AgentState
 from langgraph_utils import (
     create_agent_graph,
     create_run_config,
+    load_fake_calls,
     print_run_end,
     print_run_start,
 )
-from llm_consts import ChatAnthropic
 from thought_logger import AgentLogger
-from supported_models import find_supported_model_given_model_name, SUPPORTED_MODELS
+from supported_models import find_supported_model_given_model_name, get_chat_client, SUPPORTED_MODELS
 
 
 class ExplorerAgent:
@@ -90,7 +93,7 @@ class ExplorerAgent:
         # Setup clients and dependencies
         await self._setup_clients()
         await self._setup_toolbox(owner, repos, installation_id, branch)
-        self._setup_llm_and_logger(llm_client, model_name, fake_calls_path)
+        await self._setup_llm_and_logger(llm_client, model_name, fake_calls_path)
         await self._setup_graph(repos)
 
         return self
@@ -105,10 +108,9 @@ class ExplorerAgent:
         )
         await self.toolbox.authenticate()
 
-    def _setup_llm_and_logger(self, llm_client, model_name, fake_calls_path=None):
+    async def _setup_llm_and_logger(self, llm_client, model_name, fake_calls_path=None):
         """Setup LLM client and logger."""
-        self.llm_client = llm_client or ChatAnthropic(model=model_name)
-        self.logger = AgentLogger(
+        self.logger = await AgentLogger.create(
             run_id=self.run_id,
         )
 
@@ -119,15 +121,12 @@ class ExplorerAgent:
             print(f'[DEBUG] Model {self.model_name} not found in {self.model_provider} models. May not be supported!')
             print('-'*50)
 
-        chat_client = chat_info['chat_class']
-        self.llm_client = chat_client(model=model_name)
+        self.llm_client = get_chat_client(self.model_provider, model_name)
 
         # Load fake responses if path is provided
         if fake_calls_path and os.path.exists(fake_calls_path):
             try:
-                with open(fake_calls_path, "r") as f:
-                    fake_calls = json.load(f)
-                for fake_call in fake_calls.get("fake_calls", []):
+                for fake_call in await load_fake_calls(fake_calls_path):
                     self.llm_client.add_fake_response(fake_call)
                 if self.live_logging:
                     print(f"Loaded fake responses from {fake_calls_path}")
@@ -137,8 +136,12 @@ class ExplorerAgent:
     async def _setup_graph(self, repos):
         """Create and configure the agent graph."""
         tools = self.toolbox.get_all_tools()
-        tool_names = [tool["name"] for tool in tools]
-        tool_descriptions = [f"{tool['name']}: {tool['description']}" for tool in tools]
+        tool_names = []
+        tool_descriptions = []
+        for tool in tools:
+            name = tool["name"]
+            tool_names.append(name)
+            tool_descriptions.append(f"{name}: {tool['description']}")
 
         prompt = STRUCTURED_EXPLORER_PROMPT.partial(
             tools="\n".join(tool_descriptions),
@@ -185,7 +188,12 @@ class ExplorerAgent:
         # )
 
         config = create_run_config(self.run_id)
-        result = await self.graph.ainvoke(initial_state, config=config)
+        try:
+            result = await self.graph.ainvoke(initial_state, config=config)
+        finally:
+            # Persist whatever the logger is still holding before handing back control
+            if self.logger:
+                await self.logger.aclose()
 
         # print_run_end(self.live_logging)
 
@@ -5,6 +5,7 @@ This module contains shared functionality used by multiple LangGraph agent imple
 such as ExplorerAgent and ProjectManagerAgent.
 """
 
+import functools
 import json
 import time
 import asyncio
@@ -12,6 +13,7 @@ import re
 import os
 import traceback
 from typing import Dict, List, Any, Optional, Type
+import orjson
 from pydantic import BaseModel
 from langgraph.graph import StateGraph, END
 
@@ -663,20 +665,26 @@ def format_other_agents_info(
     if live_logging:
         print(f"\n[DEBUG] Formatting info for {len(other_agents)} other agents")
 
-    formatted_info = "Other agents currently working on related tasks:\n\n"
-
-    for i, agent in enumerate(other_agents, 1):
-        run_id = agent.get("run_id", "Unknown")
-        description = agent.get("description", "No description available")
-        repo = agent.get("repo", "Unknown repository")
-
-        formatted_info += f"{i}. Agent {run_id}\n"
-        formatted_info += f"   Repository: {repo}\n"
-        formatted_info += f"   Subtask: {description}\n\n"
+    return _format_other_agents_cached(
+        tuple(
+            (
+                agent.get("run_id", "Unknown"),
+                agent.get("description", "No description available"),
+                agent.get("repo", "Unknown repository"),
+            )
+            for agent in other_agents
+        )
+    )
 
-    formatted_info += "Consider coordinating with these agents to avoid duplicate work and leverage their insights."
 
-    return formatted_info
+@functools.lru_cache(maxsize=128)
+def _format_other_agents_cached(agents_key: tuple) -> str:
+    """Build the other-agents prompt section from (run_id, description, repo) tuples. Cached since PM and SWE format the same list."""
+    parts = ["Other agents currently working on related tasks:\n\n"]
+    for i, (run_id, description, repo) in enumerate(agents_key, 1):
+        parts.append(f"{i}. Agent {run_id}\n   Repository: {repo}\n   Subtask: {description}\n\n")
+    parts.append("Consider coordinating with these agents to avoid duplicate work and leverage their insights.")
+    return "".join(parts)
 
 
 def extract_tag_info(text: str, tag: str) -> Optional[str]:
@@ -718,3 +726,25 @@ def serialize_tools(tools: List[Any]) -> List[Dict[str, Any]]:
     for x in copy:
         x.pop("function")
     return copy
+
+
+@functools.lru_cache(maxsize=8)
+def _read_fake_calls(path: str, mtime_ns: int) -> tuple:
+    """Read and parse a fake-calls fixture. Keyed on mtime so edits to the file are picked up."""
+    with open(path, "rb") as f:
+        return tuple(orjson.loads(f.read()).get("fake_calls", []))
+
+
+async def load_fake_calls(path: str) -> tuple:
+    """
+    Load the "fake_calls" list from a JSON fixture without blocking the event loop.
+
+    Args:
+        path: Path to the JSON file containing fake LLM responses
+
+    Returns:
+        Tuple of fake call entries; parsed results are cached per (path, mtime)
+    """
+    return await asyncio.to_thread(
+        lambda: _read_fake_calls(path, os.stat(path).st_mtime_ns)
+    )
@@ -9,11 +9,19 @@ on how to migrate.
 """
 
 import aiohttp
+import asyncio
+import collections
 import os
-import datetime
+import hashlib
+import time
 import pathlib
-from typing import List, Optional, Dict, Any, Union
-import json
+from dataclasses import dataclass
+import random
+import re
+import weakref
+from typing import List, Optional, Dict, Any, Tuple, Union
+import orjson
+import yarl
 from pydantic import BaseModel, Field
 
 try:
@@ -24,6 +32,36 @@ except ImportError:
 
 import uuid
 
+# Pulls an HTTP status code out of aiohttp error messages that don't carry a .status
+_STATUS_RE = re.compile(r"(\d{3})")
+
+# Endpoints, parsed once instead of on every request
+_ANTHROPIC_URL = yarl.URL("https://api.anthropic.com/v1/messages")
+_OPENAI_URL = yarl.URL("https://api.openai.com/v1/chat/completions")
+
+# Non-streaming completions send nothing until they finish, so only bound connect, not socket reads
+_DEFAULT_TIMEOUT = aiohttp.ClientTimeout(total=300, connect=10)
+
+# Transient failures retried in place, before the error reaches the agent loop's own retries
+_RETRYABLE_STATUS = frozenset((429, 500, 502, 503, 504, 529))
+_RETRYABLE_ERRORS = (aiohttp.ClientConnectorError, aiohttp.ServerDisconnectedError)
+
+# Where raw_logging writes payloads and parsed responses
+_LOG_DIR = pathlib.Path("logs/llm_logs")
+# (epoch second, formatted "%Y%m%d_%H%M%S") of the most recent log timestamp
+_log_ts_cache = (None, "")
+
+
+def _log_timestamp() -> str:
+    """Local time as "%Y%m%d_%H%M%S_%f", only running strftime when the second changes."""
+    global _log_ts_cache
+    second, micro = divmod(time.time_ns() // 1000, 1_000_000)
+    cached_second, prefix = _log_ts_cache
+    if second != cached_second:
+        prefix = time.strftime("%Y%m%d_%H%M%S", time.localtime(second))
+        _log_ts_cache = (second, prefix)
+    return f"{prefix}_{micro:06d}"
+
 
 class ToolCall(BaseModel):
     """
@@ -50,6 +88,34 @@ class ToolResult(BaseModel):
     name: Optional[str] = Field(None, description="Name of the tool that was called")
 
 
+@dataclass(slots=True)
+class _ToolCall:
+    """Unvalidated tool call built while parsing; exposed as a ToolCall by get_tool_calls()."""
+    id: str
+    name: str
+    input: Dict[str, Any]
+    type: Optional[str] = None
+    server_executed: Optional[bool] = None
+
+    def to_model(self) -> ToolCall:
+        # Fields come straight from the provider response, so skip re-validation
+        return ToolCall.model_construct(
+            id=self.id, name=self.name, input=self.input, type=self.type, server_executed=self.server_executed
+        )
+
+
+@dataclass(slots=True)
+class _ToolResult:
+    """Unvalidated tool result built while parsing; exposed as a ToolResult by get_tool_results()."""
+    content: Union[str, List[Any]]
+    type: str
+    id: Optional[str] = None
+    name: Optional[str] = None
+
+    def to_model(self) -> ToolResult:
+        return ToolResult.model_construct(content=self.content, type=self.type, id=self.id, name=self.name)
+
+
 class LLMResponseData(BaseModel):
     """
     Pydantic model for the complete LLM response data.
@@ -68,6 +134,8 @@ class LLMResponse:
     Just defines standard getter methods for the ToolCalls, ToolResults, and TextContent.
     """
 
+    __slots__ = ("content", "text_content", "status_code", "raw_logging", "_tool_calls", "_tool_results")
+
     def __init__(self, content: Union[str, List[Dict[str, Any]]], status_code: int = 200, raw_logging: bool = False):
         """
         Initialize an LLM response. The getter methods are used by LangGraphUtils to parse the response.
@@ -77,12 +145,13 @@ class LLMResponse:
             status_code: HTTP status code of the response
             raw_logging: Whether to log parsed response to a file
         """
+        self.raw_logging = raw_logging
         self.content = content
         self.text_content = ""
         self.status_code = status_code
-        self.tool_calls: List[ToolCall] = []
-        self.tool_results: Dict[str, ToolResult] = {} # maps the id of the tool call to the result.
-        self.raw_logging = raw_logging
+        # Created on first use; most responses carry no tool calls or server tool results
+        self._tool_calls: Optional[List[_ToolCall]] = None
+        self._tool_results: Optional[Dict[str, _ToolResult]] = None # maps the id of the tool call to the result.
 
         # Process content to extract tool calls and results
         self._process_content()
@@ -91,6 +160,18 @@ class LLMResponse:
         if self.raw_logging:
             self._log_parsed_response()
 
+    @property
+    def tool_calls(self) -> List[_ToolCall]:
+        if self._tool_calls is None:
+            self._tool_calls = []
+        return self._tool_calls
+
+    @property
+    def tool_results(self) -> Dict[str, _ToolResult]:
+        if self._tool_results is None:
+            self._tool_results = {}
+        return self._tool_results
+
     def _process_content(self):
         """
         Base implementation of content processing. Should be overridden by subclasses.
@@ -104,28 +185,22 @@ class LLMResponse:
         if not self.raw_logging:
             return
 
-        # Create logs directory if it doesn't exist
-        log_dir = pathlib.Path("logs/llm_logs")
-        log_dir.mkdir(parents=True, exist_ok=True)
-
-        # Generate timestamp for the filename
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S_%f")
-        log_file = log_dir / f"{timestamp}_parsed_response.json"
+        # The writer creates the directory when it flushes
+        log_file = _LOG_DIR / f"{_log_timestamp()}_parsed_response.json"
 
         # Get response data as a dictionary
         response_data = self.get_response_data().dict()
 
-        # Write response data to file
-        with open(log_file, "w") as f:
-            json.dump(response_data, f, indent=2, default=str)
+        # Hand off to the background writer
+        _raw_log_writer.submit(log_file, response_data)
 
     def get_tool_calls(self) -> List[ToolCall]:
         """Return list of ToolCall Pydantic models."""
-        return self.tool_calls
+        return [tool_call.to_model() for tool_call in self._tool_calls or ()]
 
     def get_tool_results(self) -> Dict[str, ToolResult]:
         """Return dictionary mapping tool call IDs to ToolResult Pydantic models."""
-        return self.tool_results
+        return {id: tool_result.to_model() for id, tool_result in (self._tool_results or {}).items()}
 
     def get_text_content(self) -> str:
         """Return the text content as a string."""
@@ -141,6 +216,57 @@ class LLMResponse:
 
 
 
+def _handle_text_block(response: "AnthropicResponse", block: Dict[str, Any], text_parts: List[str]):
+    text_parts.append(block.get("text", ""))
+
+
+def _handle_tool_use_block(response: "AnthropicResponse", block: Dict[str, Any], text_parts: List[str]):
+    response.tool_calls.append(_ToolCall(
+        id=block.get("id", ""),
+        name=block.get("name", ""),
+        input=block.get("input", {}),
+        type="tool_use",
+        server_executed=False
+    ))
+
+
+def _handle_server_tool_use_block(response: "AnthropicResponse", block: Dict[str, Any], text_parts: List[str]):
+    response.tool_calls.append(_ToolCall(
+        id=block.get("id", ""),
+        name=block.get("name", ""),
+        input=block.get("input", {}),
+        type="server_tool_use",
+        server_executed=True
+    ))
+
+
+def _handle_web_search_tool_result_block(response: "AnthropicResponse", block: Dict[str, Any], text_parts: List[str]):
+    # Keyed by the id of the server_tool_use call it answers
+    id = block.get("tool_use_id", "")
+    content_processed = [
+        {
+            "type": content_block.get("type", ""),
+            "title": content_block.get("title", ""),
+            "url": content_block.get("url", ""),
+        }
+        for content_block in block.get("content", ())
+    ]
+    response.tool_results[id] = _ToolResult(
+        content=content_processed,
+        type="web_search_tool_result",
+        id=id
+    )
+
+
+# Content block type -> handler used by AnthropicResponse._process_content
+_ANTHROPIC_BLOCK_HANDLERS = {
+    "text": _handle_text_block,
+    "tool_use": _handle_tool_use_block,
+    "server_tool_use": _handle_server_tool_use_block,
+    "web_search_tool_result": _handle_web_search_tool_result_block,
+}
+
+
 class AnthropicResponse(LLMResponse):
     """
     Anthropic-specific response wrapper that inherits from LLMResponse.
@@ -148,6 +274,8 @@ class AnthropicResponse(LLMResponse):
     Handles the definition of _process_content() in order to extract tool calls, tool results, and text content.
     """
 
+    __slots__ = ()
+
     def __init__(self, content: Union[str, List[Dict[str, Any]]], status_code: int = 200, raw_logging: bool = False):
         """
         Initialize an Anthropic response wrapper.
@@ -177,65 +305,301 @@ class AnthropicResponse(LLMResponse):
         # Process list of content blocks
         if isinstance(self.content, list):
             text_parts = []
+            get_handler = _ANTHROPIC_BLOCK_HANDLERS.get
             for block in self.content:
-                if isinstance(block, dict):
-                    if block.get("type") == "text":
-                        # Extract text content
-                        text_parts.append(block.get("text", ""))
-                    elif block.get("type") == "tool_use":
-                        # Create ToolCall Pydantic model
-                        tool_call = ToolCall(
-                            id=block.get("id", ""),
-                            name=block.get("name", ""),
-                            input=block.get("input", {}),
-                            type="tool_use",
-                            server_executed=False
-                        )
-                        self.tool_calls.append(tool_call)
-                    elif block.get("type") == "server_tool_use":
-                        # Create ToolCall Pydantic model
-                        tool_call = ToolCall(
-                            id=block.get("id", ""),
-                            name=block.get("name", ""),
-                            input=block.get("input", {}),
-                            type="server_tool_use",
-                            server_executed=True
-                        )
-                        self.tool_calls.append(tool_call)
-                    elif block.get("type") == "web_search_tool_result":
-                        # Create ToolResult Pydantic model
-                        type = block.get("type", "")
-                        id = block.get("tool_use_id", "")
-                        content_processed = []
-                        if type == "web_search_tool_result":
-                            content = block.get("content", {})
-                            for content_block in content:
-                                content_processed.append({
-                                    "type": content_block.get("type", ""),
-                                    "title": content_block.get("title", ""),
-                                    "url": content_block.get("url", ""),
-                                })
-
-                        tool_result = ToolResult(
-                            content=content_processed,
-                            type=type,
-                            id=id
-                        )
-                        self.tool_results[block.get("id", "")] = tool_result
-
-                    # Not supporting other content blcoks (i.e. citations, etc.)
-                    else:
-                        continue
+                if type(block) is dict:
+                    # Not supporting other content blocks (i.e. citations, etc.)
+                    handler = get_handler(block.get("type"))
+                    if handler is not None:
+                        handler(self, block, text_parts)
 
             # Set the concatenated text content
             self.text_content = "".join(text_parts)
 
         print(f"\n[DEBUG] Text content: {self.text_content}")
-        print(f"\n[DEBUG] Tool calls: {self.tool_calls}")
-        print(f"\n[DEBUG] Tool results: {self.tool_results}")
+        print(f"\n[DEBUG] Tool calls: {self._tool_calls or []}")
+        print(f"\n[DEBUG] Tool results: {self._tool_results or {}}")
+
+
+
+
+
+def _encode_payload(payload: Dict[str, Any], tools_json: Optional[bytes] = None) -> bytes:
+    """
+    Encode a request payload as JSON bytes, splicing in an already-encoded "tools" array if given.
+    """
+    body = orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS)
+    if tools_json:
+        body = body[:-1] + b',"tools":' + tools_json + b"}"
+    return body
+
+
+class _RawLogWriter:
+    """
+    Writes raw-logging files from a single background task so requests never wait on disk.
+
+    Entries are serialized when they are submitted (so later mutation of the logged objects can't
+    leak into the file) and written in batches of up to `batch_size` entries or every
+    `flush_interval` seconds, whichever comes first. Batches are written on a worker thread so the
+    event loop never blocks on the filesystem. Outside of a running event loop entries are written
+    immediately.
+    """
+
+    batch_size = 64
+    flush_interval = 0.1
+
+    def __init__(self):
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        # Directories already created, so each is only mkdir'd once per process
+        self._created_dirs = set()
 
+    def submit(self, path: pathlib.Path, data: Any):
+        """
+        Queue `data` to be written to `path` as indented JSON.
+
+        Args:
+            path: File to write
+            data: JSON-serializable object to log
+        """
+        # Encode up front so each file is one write of ready bytes, not a json.dump stream of small writes
+        entry = (path, orjson.dumps(data, default=str, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._write_batch([entry])
+            return
+
+        # The queue and worker belong to the loop that created them
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._queue = asyncio.Queue()
+            self._task = loop.create_task(self._run(self._queue))
+        self._queue.put_nowait(entry)
+
+    async def _run(self, queue: asyncio.Queue):
+        loop = asyncio.get_running_loop()
+        batch = []
+        try:
+            while True:
+                batch.append(await queue.get())
+                deadline = loop.time() + self.flush_interval
+                while len(batch) < self.batch_size:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+                pending, batch = batch, []
+                await asyncio.to_thread(self._write_batch, pending)
+        except asyncio.CancelledError:
+            # Loop is shutting down: flush whatever is still pending before exiting
+            while not queue.empty():
+                batch.append(queue.get_nowait())
+            self._write_batch(batch)
+            raise
+
+    def _write_batch(self, batch):
+        for path, data in batch:
+            log_dir = path.parent
+            if log_dir not in self._created_dirs:
+                log_dir.mkdir(parents=True, exist_ok=True)
+                self._created_dirs.add(log_dir)
+            try:
+                with open(path, "wb") as f:
+                    f.write(data)
+            except FileNotFoundError:
+                # Directory was removed after we created it
+                log_dir.mkdir(parents=True, exist_ok=True)
+                with open(path, "wb") as f:
+                    f.write(data)
+
+
+# Shared by every client and response so raw logs go through one writer
+_raw_log_writer = _RawLogWriter()
+
+
+class ResponseCache:
+    """
+    Exact-match cache of raw API response bodies, keyed by a hash of the endpoint and encoded request.
+
+    Entries expire after `ttl` seconds and the least recently used entry is evicted once `max_entries`
+    is reached. Bodies are kept as bytes so every hit decodes into fresh objects that callers may mutate.
+    """
+
+    def __init__(self, ttl: float, max_entries: int = 256):
+        """
+        Args:
+            ttl: Seconds an entry stays valid
+            max_entries: Maximum number of cached responses
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "collections.OrderedDict[bytes, Tuple[bytes, int, float]]" = collections.OrderedDict()
+
+    @staticmethod
+    def make_key(url, body: bytes) -> bytes:
+        """Hash an endpoint and its encoded request body into a cache key."""
+        digest = hashlib.blake2b(str(url).encode(), digest_size=16)
+        digest.update(body)
+        return digest.digest()
+
+    def get(self, key: bytes) -> Optional[Tuple[bytes, int]]:
+        """Return (body, status_code) for a live entry, or None."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        body, status_code, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return body, status_code
+
+    def put(self, key: bytes, body: bytes, status_code: int):
+        """Store a response body, evicting the least recently used entries past max_entries."""
+        self._entries[key] = (body, status_code, time.monotonic() + self.ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop every cached response."""
+        self._entries.clear()
+
+
+class _RequestLimiter:
+    """
+    Bounds the number of in-flight requests and the requests-per-minute sent to a single provider.
+
+    The concurrency limit is adjusted with AIMD: it grows by 0.5 after each successful call while the
+    rolling mean latency stays under target, and halves on 429/5xx. Rate-limit response headers
+    (retry-after, remaining requests) pause new requests until the provider's budget recovers.
+
+    asyncio primitives belong to the loop that first uses them, so a limiter is only valid for the
+    loop it was built in (see ChatLLM._get_limiter).
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        max_rpm: int,
+        loop: asyncio.AbstractEventLoop,
+        remaining_header: Optional[str] = None,
+        target_latency: float = 60.0,
+        latency_window: int = 20,
+    ):
+        """
+        Args:
+            max_concurrency: Maximum number of requests allowed in flight at once
+            max_rpm: Maximum number of requests started in any 60 second window (0 disables the check)
+            loop: The event loop this limiter is bound to
+            remaining_header: Provider header reporting the remaining request budget, if any
+            target_latency: Mean latency (seconds) under which the concurrency limit is allowed to grow
+            latency_window: Number of recent successful calls used for the rolling mean latency
+        """
+        self.loop = loop
+        self._max_concurrency = max(1, max_concurrency)
+        self._limit = float(self._max_concurrency)
+        self._in_flight = 0
+        self._condition = asyncio.Condition()
+        self._max_rpm = max_rpm
+        self._window = collections.deque()  # monotonic start times of recent requests
+        self._window_lock = asyncio.Lock()
+        self._remaining_header = remaining_header
+        self._target_latency = target_latency
+        self._latencies = collections.deque(maxlen=latency_window)
+        self._paused_until = 0.0  # monotonic time before which no new request may start
+
+    async def __aenter__(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._in_flight < int(self._limit))
+            self._in_flight += 1
+        try:
+            await self._wait_for_pause()
+            await self._wait_for_rpm_slot()
+        except BaseException:
+            await self._release()
+            raise
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self._release()
+
+    async def _release(self):
+        async with self._condition:
+            self._in_flight -= 1
+            self._condition.notify_all()
+
+    async def _wait_for_pause(self):
+        """Sleep while the provider has asked us to back off."""
+        delay = self._paused_until - time.monotonic()
+        while delay > 0:
+            await asyncio.sleep(delay)
+            delay = self._paused_until - time.monotonic()
+
+    async def _wait_for_rpm_slot(self):
+        """Sleep until the sliding 60 second window has room for another request."""
+        if self._max_rpm <= 0:
+            return
 
+        async with self._window_lock:
+            while True:
+                now = time.monotonic()
+                while self._window and now - self._window[0] >= 60:
+                    self._window.popleft()
+                if len(self._window) < self._max_rpm:
+                    self._window.append(now)
+                    return
+                await asyncio.sleep(60 - (now - self._window[0]))
+
+    def record_response(self, status_code: int, headers, latency: float):
+        """
+        Feed the outcome of a request back into the controller.
 
+        Args:
+            status_code: HTTP status of the response
+            headers: Response headers (any mapping with .get)
+            latency: Seconds between sending the request and receiving the response
+        """
+        if status_code == 429 or status_code >= 500:
+            self._limit = max(1.0, self._limit * 0.5)
+        elif status_code == 200:
+            self._latencies.append(latency)
+            mean_latency = sum(self._latencies) / len(self._latencies)
+            if mean_latency <= self._target_latency and self._limit < self._max_concurrency:
+                self._limit = min(float(self._max_concurrency), self._limit + 0.5)
+                self._notify_waiters()
+
+        self._pause_from_headers(headers)
+
+    def _pause_from_headers(self, headers):
+        """Pause new requests for the interval the provider advertises."""
+        delay = 0.0
+        retry_after = headers.get("retry-after")
+        if retry_after:
+            try:
+                delay = float(retry_after)
+            except ValueError:
+                delay = 0.0
+
+        if not delay and self._remaining_header:
+            remaining = headers.get(self._remaining_header)
+            # Fewer requests left than we already have in flight: wait briefly for the budget to refill
+            if remaining is not None and remaining.isdigit() and int(remaining) < self._in_flight:
+                delay = 1.0
+
+        if delay > 0:
+            self._paused_until = max(self._paused_until, time.monotonic() + delay)
+
+    def _notify_waiters(self):
+        """Wake acquirers after the limit grows (record_response is sync, so schedule the notify)."""
+        async def notify():
+            async with self._condition:
+                self._condition.notify_all()
+
+        self.loop.create_task(notify())
 
 
 class ChatLLM:
@@ -283,22 +647,166 @@ class ChatLLM:
     ```
     """
 
+    __slots__ = (
+        "model",
+        "api_key",
+        "raw_logging",
+        "_headers",
+        "_tools_key",
+        "_tools_src",
+        "_server_tools_src",
+        "_api_tools",
+        "_api_tools_json",
+        "_recv_bufs",
+        "_cache",
+        "_session",
+        "_session_loop",
+        "_warmed",
+        "__weakref__",
+    )
+
     # Class variable to store fake responses
     _fake_responses = []
     # Flag to indicate if fake responses were ever added
     _using_fake_responses = False
 
-    def __init__(self, model: str, api_key: Optional[str] = None, raw_logging: bool = False):
-        """Initialize a chat with an LLM with a model str and an API key."""
-        self.model = model
-        if not self.model or not isinstance(self.model, str):
+    # Env vars bounding concurrent requests / requests per minute. Overridden per provider.
+    _max_concurrency_env = "LLM_MAX_CONCURRENCY"
+    _max_rpm_env = "LLM_MAX_RPM"
+    # Response header reporting the remaining request budget, if the provider sends one
+    _ratelimit_remaining_header = None
+    # Request limiters shared by every client of the same provider, keyed by class name
+    _limiters: Dict[str, _RequestLimiter] = {}
+    # Any URL on the provider's API host; warmup() requests it to open a pooled connection early
+    _warmup_url = None
+    # Connection pool shared by every client's session in the current event loop
+    _connector: Optional[aiohttp.TCPConnector] = None
+    _connector_loop: Optional[asyncio.AbstractEventLoop] = None
+    # Clients with an open session, so close_all() can reach them on shutdown
+    _open_clients: "weakref.WeakSet[ChatLLM]" = weakref.WeakSet()
+    # Chunk size used when streaming response bodies
+    _recv_chunk_size = 65536
+    # Receive buffers that grew past this (an unusually large response) are dropped instead of pooled
+    _recv_buf_max_pooled = 4 * 1024 * 1024
+    # In-place retries for transient failures: exponential backoff from the base delay, capped, plus jitter
+    _max_retries = 3
+    _retry_base_delay = 1.0
+    _retry_max_delay = 30.0
+
+    def __init__(
+        self,
+        model: str,
+        api_key: Optional[str] = None,
+        raw_logging: bool = False,
+        cache_ttl: float = 0,
+        cache_size: int = 256,
+    ):
+        """
+        Initialize a chat with an LLM with a model str and an API key.
+
+        Identical requests can be answered from an in-memory response cache by passing cache_ttl > 0
+        (seconds); it is off by default since agents usually want a fresh sample on every call.
+        """
+        if type(model) is not str or not model:
             raise ValueError("Invalid model name. Must be a non-empty string.")
+        self.model = model
         self.api_key = api_key
         if not self.api_key:
             raise ValueError("ANTHROPIC_API_KEY environment variable or api_key parameter must be set")
         self.raw_logging = raw_logging  # Use the passed parameter instead of hardcoding
         print(f"\n[DEBUG] ChatLLM initialized with raw_logging={self.raw_logging}")
 
+        # Provider-formatted tool list and its JSON encoding, rebuilt only when the tool set changes
+        self._tools_key = None
+        self._tools_src = None
+        self._server_tools_src = None
+        self._api_tools: List[Dict[str, Any]] = []
+        self._api_tools_json: Optional[bytes] = None
+
+        # Free list of receive buffers, reused across requests (one per concurrent request)
+        self._recv_bufs: List[bytearray] = []
+
+        self._cache = ResponseCache(cache_ttl, cache_size) if cache_ttl > 0 else None
+
+        # Keep-alive HTTP session, created lazily in (and bound to) the event loop that first uses it
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._warmed = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+
+    @staticmethod
+    def _get_connector(loop: asyncio.AbstractEventLoop) -> aiohttp.TCPConnector:
+        """
+        Return the connector shared by all chat clients in this loop, creating it if missing or closed.
+
+        Every client's session draws from this one pool, so agents on different models or providers
+        reuse warm keep-alive connections and share a single concurrency budget.
+        """
+        connector = ChatLLM._connector
+        if connector is None or connector.closed or ChatLLM._connector_loop is not loop:
+            connector = aiohttp.TCPConnector(limit=200, limit_per_host=100, keepalive_timeout=75, ttl_dns_cache=300)
+            ChatLLM._connector = connector
+            ChatLLM._connector_loop = loop
+        return connector
+
+    @staticmethod
+    async def close_connector():
+        """Close the shared connection pool, if it belongs to the running loop. Call on shutdown."""
+        connector, ChatLLM._connector = ChatLLM._connector, None
+        if connector is not None and not connector.closed and ChatLLM._connector_loop is asyncio.get_running_loop():
+            await connector.close()
+        ChatLLM._connector_loop = None
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Return this client's session, creating it if missing, closed, or from another loop."""
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            self._session = aiohttp.ClientSession(
+                connector=self._get_connector(loop),
+                connector_owner=False,
+                timeout=_DEFAULT_TIMEOUT,
+                read_bufsize=self._recv_chunk_size,
+                headers=self._headers,
+            )
+            self._session_loop = loop
+            ChatLLM._open_clients.add(self)
+        return self._session
+
+    async def warmup(self):
+        """
+        Open a pooled connection to the provider ahead of the first real request, so that request
+        doesn't pay for DNS, TCP and TLS setup. Runs once per client; failures are only logged.
+        """
+        if self._warmed or self._using_fake_responses or self._warmup_url is None:
+            return
+        self._warmed = True
+        session = await self._get_session()
+        try:
+            async with session.head(self._warmup_url) as response:
+                await response.read()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"\n[DEBUG] Connection warmup for {self.model} failed: {e}")
+
+    async def aclose(self):
+        """Close this client's HTTP session, if one is open in the running loop. The shared pool stays open."""
+        session, self._session = self._session, None
+        ChatLLM._open_clients.discard(self)
+        if session is not None and not session.closed and self._session_loop is asyncio.get_running_loop():
+            await session.close()
+        self._session_loop = None
+
+    @staticmethod
+    async def close_all():
+        """Close every client's session, then the shared pool. Call once on shutdown."""
+        for client in list(ChatLLM._open_clients):
+            await client.aclose()
+        await ChatLLM.close_connector()
+
     @classmethod
     def add_fake_response(cls, response_data: Dict[str, Any], status_code: int = 200):
         """
@@ -348,19 +856,94 @@ class ChatLLM:
         cls._using_fake_responses = False
         print(f"\n[DEBUG] Cleared {count} fake response(s)")
 
+    @classmethod
+    def _get_limiter(cls) -> _RequestLimiter:
+        """
+        Return the request limiter for this provider, building it lazily in the running event loop.
+        """
+        loop = asyncio.get_running_loop()
+        limiter = ChatLLM._limiters.get(cls.__name__)
+        if limiter is None or limiter.loop is not loop:
+            limiter = _RequestLimiter(
+                max_concurrency=int(os.getenv(cls._max_concurrency_env, "32")),
+                max_rpm=int(os.getenv(cls._max_rpm_env, "0")),
+                loop=loop,
+                remaining_header=cls._ratelimit_remaining_header,
+            )
+            ChatLLM._limiters[cls.__name__] = limiter
+        return limiter
+
+    def _get_api_tools(self, tools, server_tools, build_api_tools):
+        """
+        Return the provider-formatted tools and their JSON encoding, building both once per tool set.
+
+        Agents rebuild an identical tool list before every call, so besides an identity fast path the
+        cache is keyed by a digest of the encoded tools. Clients are shared between agents whose tools
+        reuse names (e.g. generate_output) with different schemas, so names alone aren't enough.
+
+        Args:
+            tools: Client-side tools in Anthropic format
+            server_tools: Server-side tool configurations
+            build_api_tools: Callable(tools, server_tools) returning the provider-formatted tool list
+
+        Returns:
+            Tuple of (api_tools, api_tools_json). api_tools_json is None when there are no tools.
+        """
+        if tools is self._tools_src and server_tools is self._server_tools_src:
+            return self._api_tools, self._api_tools_json
+
+        key = hashlib.blake2b(
+            orjson.dumps((tools or [], server_tools or {}), option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SORT_KEYS),
+            digest_size=16,
+        ).digest()
+        if key != self._tools_key:
+            self._api_tools = build_api_tools(tools, server_tools)
+            self._api_tools_json = orjson.dumps(self._api_tools, option=orjson.OPT_NON_STR_KEYS) if self._api_tools else None
+            self._tools_key = key
+
+        # Hold references so the identity check can't be fooled by a recycled id()
+        self._tools_src = tools
+        self._server_tools_src = server_tools
+        return self._api_tools, self._api_tools_json
+
+    async def _read_body(self, response: aiohttp.ClientResponse, buf: bytearray) -> int:
+        """
+        Stream a response body into a pooled buffer.
+
+        Buffers keep their high-water size between calls, so steady-state requests
+        don't reallocate while the body arrives.
+
+        Args:
+            response: The aiohttp response to read
+            buf: Receive buffer taken from self._recv_bufs
+
+        Returns:
+            Number of bytes written to the start of buf
+        """
+        size = 0
+        async for chunk in response.content.iter_chunked(self._recv_chunk_size):
+            end = size + len(chunk)
+            buf[size:end] = chunk
+            size = end
+        return size
+
     def _filter_messages(self, messages: List[Dict[str, Any]]) -> str:
         """
         Extract the system prompt from the rest of the messages.
 
         Returns: system_prompt, rest_of_messages
         """
+        # Fast path: the agents always put the single system message first
+        if messages and messages[0].get("role") == "system":
+            rest_of_messages = messages[1:]
+            if all(message.get("role") != "system" for message in rest_of_messages):
+                return messages[0].get("content", ""), rest_of_messages
+
         system_prompt = None
-        rest_of_messages = []
         for message in messages:
             if message.get("role") == "system":
                 system_prompt = message.get("content", "")
-            else:
-                rest_of_messages.append(message)
+        rest_of_messages = [message for message in messages if message.get("role") != "system"]
         return system_prompt, rest_of_messages
 
     def _log_api_payload(self, payload: Dict[str, Any]):
@@ -373,19 +956,13 @@ class ChatLLM:
         if not self.raw_logging:
             return
 
-        # Create logs directory if it doesn't exist
-        log_dir = pathlib.Path("logs/llm_logs")
-        log_dir.mkdir(parents=True, exist_ok=True)
-
-        # Generate timestamp for the filename
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S_%f")
-        log_file = log_dir / f"{timestamp}_api_payload.json"
+        # The writer creates the directory when it flushes
+        log_file = _LOG_DIR / f"{_log_timestamp()}_api_payload.json"
 
-        # Write payload to file
-        with open(log_file, "w") as f:
-            json.dump(payload, f, indent=2, default=str)
+        # Hand off to the background writer
+        _raw_log_writer.submit(log_file, payload)
 
-    async def _make_api_request(self, url: str, payload: Dict[str, Any], headers: Dict[str, str]):
+    async def _make_api_request(self, url: Union[str, yarl.URL], payload: Dict[str, Any], headers: Dict[str, str], body: Optional[bytes] = None):
         """
         Generic method to make API requests with proper error handling.
         Supports fake responses for testing purposes.
@@ -398,7 +975,8 @@ class ChatLLM:
         Args:
             url: API endpoint URL
             payload: Request payload
-            headers: Request headers
+            headers: Request headers (must include Content-Type)
+            body: Pre-encoded JSON body. If None, the payload is encoded here.
 
         Returns:
             Response data and status code as a tuple (response_data, status_code)
@@ -433,35 +1011,94 @@ class ChatLLM:
 
 
 
+        data = body if body is not None else _encode_payload(payload)
+
+        cache_key = None
+        if self._cache is not None:
+            cache_key = ResponseCache.make_key(url, data)
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                print("\n[DEBUG] Using cached response")
+                cached_body, status_code = cached
+                return orjson.loads(cached_body), status_code
+
+        buf = self._recv_bufs.pop() if self._recv_bufs else bytearray(self._recv_chunk_size)
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    url,
-                    json=payload,
-                    headers=headers,
-                    timeout=aiohttp.ClientTimeout(total=300),
-                ) as response:
+            for attempt in range(self._max_retries + 1):
+                try:
+                    status_code, size = await self._send_request(url, data, headers, buf)
+                    break
+                except Exception as e:
+                    if attempt == self._max_retries or not getattr(e, "retryable", False):
+                        raise
+                    # Any retry-after from the provider is enforced by the limiter on the next attempt
+                    delay = min(self._retry_max_delay, self._retry_base_delay * 2 ** attempt) + random.random() * 0.1
+                    print(f"\n[DEBUG] Transient API error (status {e.status_code}), retry {attempt + 1}/{self._max_retries} in {delay:.2f}s")
+                    await asyncio.sleep(delay)
+
+            with memoryview(buf)[:size] as response_body:
+                response_data = orjson.loads(response_body)
+            if cache_key is not None:
+                self._cache.put(cache_key, bytes(buf[:size]), status_code)
+            return response_data, status_code
+        finally:
+            if len(buf) <= self._recv_buf_max_pooled:
+                self._recv_bufs.append(buf)
+
+    async def _send_request(self, url: Union[str, yarl.URL], data: bytes, headers: Dict[str, str], buf: bytearray):
+        """
+        Send one request and read its body into buf.
+
+        Args:
+            url: API endpoint URL
+            data: Encoded JSON request body
+            headers: Request headers
+            buf: Receive buffer for the response body
+
+        Returns:
+            Tuple of (status_code, body_size)
+
+        Raises:
+            Exception: For API errors (status != 200) or network issues, with status_code and
+                retryable attributes attached
+        """
+        try:
+            session = await self._get_session()
+            # Bound in-flight requests so agent fan-out doesn't blow through provider rate limits
+            limiter = self._get_limiter()
+            async with limiter:
+                started = time.monotonic()
+                # The client's own headers are session defaults; only send others explicitly
+                request_headers = None if headers is self._headers else headers
+                async with session.post(url, data=data, headers=request_headers) as response:
                     status_code = response.status
+                    limiter.record_response(status_code, response.headers, time.monotonic() - started)
                     if response.status != 200:
                         error_text = await response.text()
                         error = Exception(f"API call failed with status {response.status}: {error_text}")
                         error.status_code = status_code  # Attach status code to exception
+                        error.retryable = status_code in _RETRYABLE_STATUS
                         raise error
 
-                    response_data = await response.json()
-                    return response_data, status_code
+                    # Read the body, then hand the connection back to the pool before it is parsed
+                    size = await self._read_body(response, buf)
+                    response.release()
+                    return status_code, size
         except aiohttp.ClientError as e:
             # Handle network-related errors
-            status_code = getattr(e, 'status', 0)
-            if not status_code and hasattr(e, 'message'):
-                # Try to extract status code from error message
-                import re
-                status_match = re.search(r'(\d{3})', str(e.message))
+            status_code = 0
+            if isinstance(e, aiohttp.ClientResponseError):
+                status_code = e.status
+            elif hasattr(e, 'message'):
+                # Try to extract status code from error message. Not str(e): connection errors
+                # embed host:port, and the port would be mistaken for a status code.
+                status_match = _STATUS_RE.search(str(e.message))
                 if status_match:
                     status_code = int(status_match.group(1))
 
             error = Exception(f"Network error: {str(e)}")
             error.status_code = status_code
+            error.retryable = isinstance(e, _RETRYABLE_ERRORS) or status_code in _RETRYABLE_STATUS
             raise error
 
 
@@ -473,7 +1110,25 @@ class NoRemainingFakeResponsesError(Exception):
 class ChatAnthropic(ChatLLM):
     """Direct Anthropic API client with tool calling support."""
 
-    def __init__(self, model: str, api_key: Optional[str] = None, raw_logging: bool = False):
+    __slots__ = ()
+
+    _max_concurrency_env = "ANTHROPIC_MAX_CONCURRENCY"
+    _max_rpm_env = "ANTHROPIC_MAX_RPM"
+    _ratelimit_remaining_header = "anthropic-ratelimit-requests-remaining"
+    _warmup_url = _ANTHROPIC_URL
+    # Sampling kwargs forwarded to the API as-is
+    _sampling_kwargs = ("temperature", "top_p", "top_k")
+    # Mark the system prompt as a prompt-cache breakpoint so tools + system are reused across turns and retries
+    _prompt_caching = True
+
+    def __init__(
+        self,
+        model: str,
+        api_key: Optional[str] = None,
+        raw_logging: bool = False,
+        cache_ttl: float = 0,
+        cache_size: int = 256,
+    ):
         """
         Initialize an Anthropic API client.
 
@@ -481,13 +1136,40 @@ class ChatAnthropic(ChatLLM):
             model: The Anthropic model to use
             api_key: Optional API key. If not provided, will try to get it from environment
             raw_logging: Whether to log API calls and responses to files
+            cache_ttl: Seconds to serve identical requests from the response cache (0 disables it)
+            cache_size: Maximum number of cached responses
         """
         # Get API key from environment if not provided
         if not api_key:
             api_key = os.environ.get("ANTHROPIC_API_KEY")
 
         # Initialize the base class with the model and API key
-        super().__init__(model, api_key, raw_logging)
+        super().__init__(model, api_key, raw_logging, cache_ttl, cache_size)
+
+        # Static request headers, built once per client
+        self._headers = {
+            aiohttp.hdrs.CONTENT_TYPE: "application/json",
+            "x-api-key": self.api_key,
+            "anthropic-version": "2023-06-01",
+        }
+
+    @staticmethod
+    def _build_api_tools(tools, server_tools) -> List[Dict[str, Any]]:
+        """Combine client-side tools and server-side tool configs into Anthropic's tools array."""
+        api_tools = list(tools or ())
+
+        if server_tools:
+            # Add server-side tools to the API payload, keeping only the fields the API accepts
+            api_tools += [
+                {
+                    "type": tool_config["type"],
+                    "name": tool_config["name"],
+                    **({"max_uses": tool_config["max_uses"]} if "max_uses" in tool_config else {}),
+                }
+                for tool_config in server_tools.values()
+            ]
+
+        return api_tools
 
     async def ainvoke(
         self,
@@ -524,50 +1206,35 @@ class ChatAnthropic(ChatLLM):
                         del content_block["name"]
                         print(f"\n[DEBUG] Removed 'name' field from tool_result in message for Anthropic API")
 
+        if system_prompt and self._prompt_caching:
+            system_prompt = [{"type": "text", "text": system_prompt, "cache_control": {"type": "ephemeral"}}]
+
         # Build API payload
         payload = {
             "model": self.model,
             "messages": filtered_messages,
             "system": system_prompt,
             "max_tokens": kwargs.get("max_tokens", 4096),
-            **{k: v for k, v in kwargs.items() if k in ["temperature", "top_p", "top_k"]}
         }
+        for key in self._sampling_kwargs:
+            if key in kwargs:
+                payload[key] = kwargs[key]
 
-        # Combine client-side and server-side tools
-        api_tools = []
-
-        if tools:
-            api_tools.extend(tools)
-
-        if server_tools:
-            # Add server-side tools to the API payload
-            for tool_config in server_tools.values():
-                # Extract only the fields needed for the API
-                api_tool = {
-                    "type": tool_config["type"],
-                    "name": tool_config["name"]
-                }
-                if "max_uses" in tool_config:
-                    api_tool["max_uses"] = tool_config["max_uses"]
-                api_tools.append(api_tool)
-
-        if api_tools:
-            payload["tools"] = api_tools
         if tool_choice:
             payload["tool_choice"] = tool_choice
 
-        # Make API call
-        headers = {
-            "Content-Type": "application/json",
-            "x-api-key": self.api_key,
-            "anthropic-version": "2023-06-01",
-        }
+        # Combine client-side and server-side tools (built and encoded once per tool set)
+        api_tools, api_tools_json = self._get_api_tools(tools, server_tools, self._build_api_tools)
+        body = _encode_payload(payload, api_tools_json)
+        if api_tools:
+            payload["tools"] = api_tools  # kept on the dict for raw logging
 
         # Make the API request and wrap the response
         response_data, status_code = await self._make_api_request(
-            "https://api.anthropic.com/v1/messages",
+            _ANTHROPIC_URL,
             payload,
-            headers
+            self._headers,
+            body=body,
         )
 
         return AnthropicResponse(response_data.get("content", []), status_code=status_code, raw_logging=self.raw_logging)
@@ -581,6 +1248,8 @@ class OpenAIResponse(LLMResponse):
     Handles parsing of OpenAI API responses to extract tool calls, tool results, and text content.
     """
 
+    __slots__ = ("finish_reason",)
+
     def __init__(self, content: Union[Dict[str, Any], List[Dict[str, Any]]], status_code: int = 200, raw_logging: bool = False):
         """
         Initialize an OpenAI response wrapper.
@@ -605,8 +1274,9 @@ class OpenAIResponse(LLMResponse):
 
         # get the first choice
         if isinstance(self.content, dict) and 'choices' in self.content:
-            message_content = self.content['choices'][0].get('message', {})
-            self.finish_reason = self.content['choices'][0].get('finish_reason', '')
+            choice = self.content['choices'][0]
+            message_content = choice.get('message', {})
+            self.finish_reason = choice.get('finish_reason', '')
         else:
             message_content = self.content
             self.finish_reason = ''
@@ -616,17 +1286,22 @@ class OpenAIResponse(LLMResponse):
         text_content = message_content['content']
         self.text_content = text_content if text_content else ""
 
+        # Text-only responses (the common case) have no tool_calls, or an explicit null
+        tool_calls = message_content.get("tool_calls")
+        if not tool_calls:
+            return
+
         # parse tool calls...
-        for tool_call in message_content.get("tool_calls", []):
+        for tool_call in tool_calls:
             id = tool_call.get("id")
             function = tool_call.get("function")
             name = function.get("name")
             args = function.get("arguments")
 
             # load the args (OpenAI uses a json string for the args)
-            args = json.loads(args)
+            args = orjson.loads(args)
             self.tool_calls.append(
-                ToolCall(
+                _ToolCall(
                     id=id,
                     name=name,
                     input=args,
@@ -641,7 +1316,23 @@ class OpenAIResponse(LLMResponse):
 class ChatOpenAI(ChatLLM):
     """OpenAI API client with tool calling support."""
 
-    def __init__(self, model: str, api_key: Optional[str] = None, raw_logging: bool = False):
+    __slots__ = ()
+
+    _max_concurrency_env = "OPENAI_MAX_CONCURRENCY"
+    _max_rpm_env = "OPENAI_MAX_RPM"
+    _ratelimit_remaining_header = "x-ratelimit-remaining-requests"
+    _warmup_url = _OPENAI_URL
+    # Sampling kwargs forwarded to the API as-is
+    _sampling_kwargs = ("temperature", "top_p")
+
+    def __init__(
+        self,
+        model: str,
+        api_key: Optional[str] = None,
+        raw_logging: bool = False,
+        cache_ttl: float = 0,
+        cache_size: int = 256,
+    ):
         """
         Initialize an OpenAI API client.
 
@@ -649,12 +1340,35 @@ class ChatOpenAI(ChatLLM):
             model: The OpenAI model to use (e.g., 'gpt-4o')
             api_key: Optional API key. If not provided, will try to get it from environment
             raw_logging: Whether to log API calls and responses to files
+            cache_ttl: Seconds to serve identical requests from the response cache (0 disables it)
+            cache_size: Maximum number of cached responses
         """
         # Get API key from environment if not provided
         if not api_key:
             api_key = os.environ.get("OPENAI_API_KEY")
 
-        super().__init__(model, api_key, raw_logging)
+        super().__init__(model, api_key, raw_logging, cache_ttl, cache_size)
+
+        # Static request headers, built once per client
+        self._headers = {
+            aiohttp.hdrs.CONTENT_TYPE: "application/json",
+            aiohttp.hdrs.AUTHORIZATION: f"Bearer {self.api_key}",
+        }
+
+    @staticmethod
+    def _build_api_tools(tools, server_tools) -> List[Dict[str, Any]]:
+        """Convert Anthropic-format tools to OpenAI function tools (server tools are not supported)."""
+        return [
+            {
+                "type": "function",
+                "function": {
+                    "name": tool.get("name", ""),
+                    "description": tool.get("description", ""),
+                    # set additionalProperties to be false (on a copy, so the caller's schema isn't mutated)
+                    "parameters": {**tool.get("input_schema", {}), "additionalProperties": False},
+                }
+            } for tool in tools or ()
+        ]
 
     async def ainvoke(
         self,
@@ -727,7 +1441,7 @@ class ChatOpenAI(ChatLLM):
                                 "type": "function",
                                 "function": {
                                     "name": block["name"],
-                                    "arguments": json.dumps(block["input"])
+                                    "arguments": orjson.dumps(block["input"]).decode()
                                 }
                             })
                     openai_messages.append(msg)
@@ -750,38 +1464,23 @@ class ChatOpenAI(ChatLLM):
             "model": self.model,
             "messages": openai_messages,
             "max_tokens": kwargs.get("max_tokens", 4096),
-            **{k: v for k, v in kwargs.items() if k in ["temperature", "top_p"]}
         }
+        for key in self._sampling_kwargs:
+            if key in kwargs:
+                payload[key] = kwargs[key]
         if use_predictive_output:
             payload["prediction"] = {
                 "type": "content",
                 "content":predictive_content
             }
 
-        # Format tools for OpenAI
-        if tools:
-            payload["tools"] = [
-                {
-                    "type": "function",
-                    "function": {
-                        "name": tool.get("name", ""),
-                        "description": tool.get("description", ""),
-                        "parameters": tool.get("input_schema", {}),
-                    }
-                } for tool in tools
-            ]
-
-            # set additionalParameters to be false
-            for tool in payload["tools"]:
-                tool["function"]["parameters"]["additionalProperties"] = False
-
+        # Format tools for OpenAI (built and encoded once per tool set)
+        api_tools, api_tools_json = self._get_api_tools(tools, None, self._build_api_tools)
+        if api_tools:
             payload["tool_choice"] = "auto" # let openai select which (if any) tools to use...
-
-        # Make API call
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {self.api_key}"
-        }
+        body = _encode_payload(payload, api_tools_json)
+        if api_tools:
+            payload["tools"] = api_tools  # kept on the dict for raw logging
 
         # Log the API payload if raw_logging is enabled
         if self.raw_logging:
@@ -789,9 +1488,10 @@ class ChatOpenAI(ChatLLM):
 
         # Make the API request and wrap the response
         response_data, status_code = await self._make_api_request(
-            "https://api.openai.com/v1/chat/completions",
+            _OPENAI_URL,
             payload,
-            headers
+            self._headers,
+            body=body,
         )
 
         # save response content to the list within the json file called fake_calls.json, which has a single key "fake_calls"
@@ -811,6 +1511,8 @@ class GeminiResponse(LLMResponse):
     Handles parsing of Gemini API responses to extract tool calls, tool results, and text content.
     """
 
+    __slots__ = ()
+
     def __init__(self, content: Union[Dict[str, Any], List[Dict[str, Any]]], status_code: int = 200, raw_logging: bool = False):
         """
         Initialize a Gemini response wrapper.
@@ -855,7 +1557,7 @@ class GeminiResponse(LLMResponse):
                     id = str(uuid.uuid4())
 
                     self.tool_calls.append(
-                        ToolCall(
+                        _ToolCall(
                             id=id,
                             name=function_name,
                             input=args,
@@ -872,7 +1574,7 @@ class GeminiResponse(LLMResponse):
                     id = str(uuid.uuid4())
 
                     # Create a ToolResult
-                    self.tool_results[id] = ToolResult(
+                    self.tool_results[id] = _ToolResult(
                         content=response_data.get('content', ''),
                         type="tool_result",
                         id=id,
@@ -883,10 +1585,69 @@ class GeminiResponse(LLMResponse):
 
 
 
+def _clean_schema_for_gemini(schema):
+    """Recursively reduce a JSON schema to what Gemini's stricter validator accepts."""
+    if not isinstance(schema, dict):
+        return schema
+
+    # Check for exclusive fields
+    exclusive_fields = ["anyOf", "any_of", "oneOf", "allOf", "not"]
+    found_exclusive = None
+    for field in exclusive_fields:
+        if field in schema:
+            found_exclusive = field
+            break
+
+    # If we found an exclusive field, only keep that field
+    if found_exclusive:
+        exclusive_value = schema[found_exclusive]
+        # Clean up the items in the exclusive field
+        if isinstance(exclusive_value, list):
+            exclusive_value = [_clean_schema_for_gemini(item) for item in exclusive_value]
+        return {found_exclusive: exclusive_value}
+
+    # Process regular schema
+    result = {}
+    for key, value in schema.items():
+        if key == "properties" and isinstance(value, dict):
+            # Process each property
+            cleaned_props = {}
+            for prop_name, prop_schema in value.items():
+                cleaned_props[prop_name] = _clean_schema_for_gemini(prop_schema)
+            result[key] = cleaned_props
+        elif key == "items" and isinstance(value, dict):
+            # Process array items
+            result[key] = _clean_schema_for_gemini(value)
+        elif isinstance(value, dict):
+            # Process nested objects
+            result[key] = _clean_schema_for_gemini(value)
+        elif isinstance(value, list) and key not in ["required", "enum"]:
+            # Process lists (except for required and enum fields)
+            result[key] = [_clean_schema_for_gemini(item) if isinstance(item, dict) else item for item in value]
+        else:
+            # Keep other values as is
+            result[key] = value
+
+    return result
+
+
 class ChatGemini(ChatLLM):
     """Gemini API client with tool calling support."""
 
-    def __init__(self, model: str, api_key: Optional[str] = None, raw_logging: bool = False):
+    __slots__ = ("_url",)
+
+    _max_concurrency_env = "GEMINI_MAX_CONCURRENCY"
+    _max_rpm_env = "GEMINI_MAX_RPM"
+    _warmup_url = yarl.URL("https://generativelanguage.googleapis.com/")
+
+    def __init__(
+        self,
+        model: str,
+        api_key: Optional[str] = None,
+        raw_logging: bool = False,
+        cache_ttl: float = 0,
+        cache_size: int = 256,
+    ):
         """
         Initialize a Gemini API client.
 
@@ -894,12 +1655,44 @@ class ChatGemini(ChatLLM):
             model: The Gemini model to use (e.g., 'gemini-1.5-pro')
             api_key: Optional API key. If not provided, will try to get it from environment
             raw_logging: Whether to log API calls and responses to files
+            cache_ttl: Seconds to serve identical requests from the response cache (0 disables it)
+            cache_size: Maximum number of cached responses
         """
         # Get API key from environment if not provided
         if not api_key:
             api_key = os.environ.get("GEMINI_API_KEY")
 
-        super().__init__(model, api_key, raw_logging)
+        super().__init__(model, api_key, raw_logging, cache_ttl, cache_size)
+
+        # Static request headers, built once per client
+        self._headers = {
+            aiohttp.hdrs.CONTENT_TYPE: "application/json",
+            "x-goog-api-key": self.api_key,
+        }
+        self._url = yarl.URL(f"https://generativelanguage.googleapis.com/v1beta/models/{self.model}:generateContent")
+
+    @staticmethod
+    def _build_api_tools(tools, server_tools) -> List[Dict[str, Any]]:
+        """Convert Anthropic-format tools to Gemini function declarations (server tools are not supported)."""
+        api_tools = []
+        for tool in tools or ():
+            # Clean up the schema for Gemini - it has stricter requirements
+            # than other LLMs for JSON Schema validation
+            parameters = _clean_schema_for_gemini(tool.get("input_schema", {}).copy())
+
+            # # Debug logging for schema cleaning
+            # if self.raw_logging:
+            #     print(f"\n[DEBUG] Original schema for tool '{tool.get('name', '')}': {json.dumps(tool.get('input_schema', {}), indent=2)}")
+            #     print(f"\n[DEBUG] Cleaned schema for tool '{tool.get('name', '')}': {json.dumps(parameters, indent=2)}")
+
+            api_tools.append({
+                "functionDeclarations": [{
+                    "name": tool.get("name", ""),
+                    "description": tool.get("description", ""),
+                    "parameters": parameters
+                }]
+            })
+        return api_tools
 
     async def ainvoke(
         self,
@@ -990,81 +1783,11 @@ class ChatGemini(ChatLLM):
                 "parts": [{"text": system_prompt}]
             }
 
-        # Format tools for Gemini
-        if tools:
-            payload["tools"] = []
-            for tool in tools:
-                # Clean up the schema for Gemini - it has stricter requirements
-                # than other LLMs for JSON Schema validation
-                parameters = tool.get("input_schema", {}).copy()
-
-                # Define a function to clean up schema recursively
-                def clean_schema_for_gemini(schema):
-                    if not isinstance(schema, dict):
-                        return schema
-
-                    # Check for exclusive fields
-                    exclusive_fields = ["anyOf", "any_of", "oneOf", "allOf", "not"]
-                    found_exclusive = None
-                    for field in exclusive_fields:
-                        if field in schema:
-                            found_exclusive = field
-                            break
-
-                    # If we found an exclusive field, only keep that field
-                    if found_exclusive:
-                        exclusive_value = schema[found_exclusive]
-                        # Clean up the items in the exclusive field
-                        if isinstance(exclusive_value, list):
-                            exclusive_value = [clean_schema_for_gemini(item) for item in exclusive_value]
-                        return {found_exclusive: exclusive_value}
-
-                    # Process regular schema
-                    result = {}
-                    for key, value in schema.items():
-                        if key == "properties" and isinstance(value, dict):
-                            # Process each property
-                            cleaned_props = {}
-                            for prop_name, prop_schema in value.items():
-                                cleaned_props[prop_name] = clean_schema_for_gemini(prop_schema)
-                            result[key] = cleaned_props
-                        elif key == "items" and isinstance(value, dict):
-                            # Process array items
-                            result[key] = clean_schema_for_gemini(value)
-                        elif isinstance(value, dict):
-                            # Process nested objects
-                            result[key] = clean_schema_for_gemini(value)
-                        elif isinstance(value, list) and key not in ["required", "enum"]:
-                            # Process lists (except for required and enum fields)
-                            result[key] = [clean_schema_for_gemini(item) if isinstance(item, dict) else item for item in value]
-                        else:
-                            # Keep other values as is
-                            result[key] = value
-
-                    return result
-
-                # Apply the cleanup to the parameters
-                parameters = clean_schema_for_gemini(parameters)
-
-                # # Debug logging for schema cleaning
-                # if self.raw_logging:
-                #     print(f"\n[DEBUG] Original schema for tool '{tool.get('name', '')}': {json.dumps(tool.get('input_schema', {}), indent=2)}")
-                #     print(f"\n[DEBUG] Cleaned schema for tool '{tool.get('name', '')}': {json.dumps(parameters, indent=2)}")
-
-                gemini_tool = {
-                    "functionDeclarations": [{
-                        "name": tool.get("name", ""),
-                        "description": tool.get("description", ""),
-                        "parameters": parameters
-                    }]
-                }
-                payload["tools"].append(gemini_tool)
-
-        # Make API call
-        headers = {
-            "Content-Type": "application/json",
-            "x-goog-api-key": self.api_key
-        }
+        # Format tools for Gemini (built and encoded once per tool set)
+        api_tools, api_tools_json = self._get_api_tools(tools, None, self._build_api_tools)
+        body = _encode_payload(payload, api_tools_json)
+        if api_tools:
+            payload["tools"] = api_tools  # kept on the dict for raw logging
 
         # Log the API payload if raw_logging is enabled
         if self.raw_logging:
@@ -1072,9 +1795,10 @@ class ChatGemini(ChatLLM):
 
         # Make the API request and wrap the response
         response_data, status_code = await self._make_api_request(
-            f"https://generativelanguage.googleapis.com/v1beta/models/{self.model}:generateContent",
+            self._url,
             payload,
-            headers
+            self._headers,
+            body=body,
         )
 
         print(f'raw response data: {response_data}')
@@ -3,10 +3,10 @@ A langgraph version of the ProjectManager class, similar to how langgraph_explor
 """
 
 import asyncio
+import functools
 import os
 import sys
 import time
-import json
 from typing import Any, Dict, List
 
 from dotenv import load_dotenv
@@ -14,51 +14,73 @@ from dotenv import load_dotenv
 # Try relative import first (for when module is imported as part of package)
 try:
     from agent_classes import ManagerToolBox
-    from llm_consts import ChatAnthropic
-    from .agent_consts import AgentState, STRUCTURED_PM_PROMPT
-    from .thought_logger import AgentLogger
     from .agent_consts import STRUCTURED_PM_PROMPT, AgentState
 
     # from ..supabase_utils import get_supabase_client, get_other_agents_from_subtask_id
-    from .fullstack_planner import ExplorerAgent
     from .langgraph_utils import (
         create_agent_graph,
         create_run_config,
         format_other_agents_info,
+        load_fake_calls,
         print_run_end,
         print_run_start,
     )
     from .swe import SoftwareEngineerAgent
     from .thought_logger import AgentLogger
-    from supported_models import find_supported_model_given_model_name, SUPPORTED_MODELS
+    from supported_models import get_chat_client, SUPPORTED_MODELS
 except (ImportError, ModuleNotFoundError):
     # Add parent directory to path for tools and supabase_utils
-    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    _utils_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if _utils_dir not in sys.path:
+        sys.path.append(_utils_dir)
     from agent_classes import ManagerToolBox
     # from supabase_utils import get_supabase_client, get_other_agents_from_subtask_id
 
     # Add current directory to sys.path for agent_consts and other local modules
-    sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+    _agents_dir = os.path.dirname(os.path.abspath(__file__))
+    if _agents_dir not in sys.path:
+        sys.path.append(_agents_dir)
 
     from agent_consts import STRUCTURED_PM_PROMPT, AgentState
-    from thought_logger import AgentLogger
-
-    # Add project root to path for cairn_utils imports
-    parent_dir = os.path.dirname(
-        os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    )
-    if parent_dir not in sys.path:
-        sys.path.append(parent_dir)
-
-    from cairn_utils.agents.swe import SoftwareEngineerAgent
     from langgraph_utils import (
         create_agent_graph,
         create_run_config,
         format_other_agents_info,
+        load_fake_calls,
     )
-    from llm_consts import ChatAnthropic
     from swe import SoftwareEngineerAgent
-    from supported_models import find_supported_model_given_model_name, SUPPORTED_MODELS
+    from thought_logger import AgentLogger
+    from supported_models import get_chat_client, SUPPORTED_MODELS
+
+@functools.lru_cache(maxsize=64)
+def _build_pm_prompt(tools_key: tuple, repos_key: tuple, branch: str, other_agents_info: str):
+    """
+    Build the PM prompt with its static sections filled in.
+
+    Cached so agents set up with the same tools, repos, branch and sibling agents reuse one prompt.
+
+    Args:
+        tools_key: Tuple of (name, description) pairs for the agent's tools
+        repos_key: Tuple of available repository names
+        branch: Branch the agent works on
+        other_agents_info: Formatted description of sibling agents
+
+    Returns:
+        PromptTemplate: The partially formatted prompt
+    """
+    names_parts = []
+    desc_parts = []
+    for name, description in tools_key:
+        names_parts.append(name)
+        desc_parts.append(f"{name}: {description}")
+
+    return STRUCTURED_PM_PROMPT.partial(
+        tools="\n".join(desc_parts),
+        tool_names=", ".join(names_parts),
+        available_repos=", ".join(repos_key),
+        branch=branch,
+        other_agents_info=other_agents_info,
+    )
 
 
 class ProjectManagerAgent:
@@ -130,9 +152,14 @@ class ProjectManagerAgent:
         self.model_name = model_name
         # Setup clients and dependencies
         await self._setup_clients()
-        await self._setup_swe_agent(owner, repos, installation_id, branch, model_name, run_id)
-        await self._setup_toolbox(owner, repos, installation_id, branch, model_name)
-        self._setup_llm_and_logger(llm_client, model_name, fake_calls_path)
+        # SWE setup and PM toolbox auth don't depend on each other, so overlap their GitHub round trips
+        # (the LLM client setup also warms its connection, so that overlaps with the GitHub auth too)
+        await asyncio.gather(
+            self._setup_swe_agent(owner, repos, installation_id, branch, model_name, run_id),
+            self._setup_toolbox(owner, repos, installation_id, branch, model_name),
+            self._setup_llm_and_logger(llm_client, model_name, fake_calls_path),
+        )
+        self.toolbox.set_swe(self.swe)
         await self._setup_graph(repos, branch)
 
         if self.live_logging:
@@ -185,13 +212,12 @@ class ProjectManagerAgent:
             parent_run_id=self.run_id,
         )
 
-        self.toolbox.set_swe(self.swe)
         await self.toolbox.authenticate()
 
-    def _setup_llm_and_logger(self, llm_client, model_name, fake_calls_path=None):
+    async def _setup_llm_and_logger(self, llm_client, model_name, fake_calls_path=None):
         """Setup LLM client and logger."""
         if not self.logger:
-            self.logger = AgentLogger(
+            self.logger = await AgentLogger.create(
                 run_id=self.run_id,
             )
 
@@ -202,35 +228,32 @@ class ProjectManagerAgent:
             print(f'[DEBUG] Model {self.model_name} not found in {self.model_provider} models. May not be supported!')
             print('-'*50)
 
-        chat_client = chat_info['chat_class']
-        self.llm_client = chat_client(model=model_name)
+        self.llm_client = get_chat_client(self.model_provider, model_name)
 
         # Load fake responses if path is provided
         if fake_calls_path and os.path.exists(fake_calls_path):
             try:
-                with open(fake_calls_path, "r") as f:
-                    fake_calls = json.load(f)
-                for fake_call in fake_calls.get("fake_calls", []):
+                for fake_call in await load_fake_calls(fake_calls_path):
                     self.llm_client.add_fake_response(fake_call)
                 if self.live_logging:
                     print(f"Loaded fake responses from {fake_calls_path}")
             except Exception as e:
                 raise RuntimeError(f"Failed to load fake responses from {fake_calls_path}. This is a fatal error as test responses are required: {str(e)}")
 
+        # Open the provider connection now rather than on the first graph step
+        await self.llm_client.warmup()
+
     async def _setup_graph(self, repos, branch):
         """Create and configure the agent graph."""
         tools = self.toolbox.get_all_tools()
-        tools_dict = {tool["name"]: tool for tool in tools}
-        tool_names = list(tools_dict.keys())
 
         other_agents_info = format_other_agents_info(self.other_agents)
 
-        prompt = STRUCTURED_PM_PROMPT.partial(
-            tools="\n".join([f"{tool['name']}: {tool['description']}" for tool in tools]),
-            tool_names=", ".join(tool_names),
-            available_repos=", ".join(repos),
-            branch=branch,
-            other_agents_info=other_agents_info,
+        prompt = _build_pm_prompt(
+            tuple([(tool["name"], tool["description"]) for tool in tools]),
+            tuple(repos),
+            branch,
+            other_agents_info,
         )
 
         self.graph = create_agent_graph(
@@ -273,7 +296,12 @@ class ProjectManagerAgent:
         # )
 
         config = create_run_config(self.run_id)
-        result = await self.graph.ainvoke(initial_state, config=config)
+        try:
+            result = await self.graph.ainvoke(initial_state, config=config)
+        finally:
+            # Persist whatever the logger is still holding before handing back control
+            if self.logger:
+                await self.logger.aclose()
 
         # print_run_end(self.live_logging)
 
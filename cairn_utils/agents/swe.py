@@ -3,7 +3,7 @@ A langgraph version of the SoftwareEngineer class, similar to how langgraph_expl
 """
 
 import asyncio
-import json
+import functools
 import time
 import sys
 import os
@@ -16,12 +16,16 @@ from datetime import datetime
 from dotenv import load_dotenv
 
 # Fix imports
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_utils_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _utils_dir not in sys.path:
+    sys.path.append(_utils_dir)
 from agent_classes import CodeEditorToolBox
 from task_storage import TaskStorage
 
 # Add current directory to sys.path for agent_consts
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+_agents_dir = os.path.dirname(os.path.abspath(__file__))
+if _agents_dir not in sys.path:
+    sys.path.append(_agents_dir)
 from llm_consts import ChatAnthropic, ChatOpenAI
 from agent_consts import AgentState, STRUCTURED_SWE_PROMPT
 from thought_logger import AgentLogger
@@ -32,8 +36,40 @@ from langgraph_utils import (
     print_run_start,
     print_run_end,
     format_other_agents_info,
+    load_fake_calls,
 )
-from supported_models import find_supported_model_given_model_name, SUPPORTED_MODELS
+from supported_models import find_supported_model_given_model_name, get_chat_client, SUPPORTED_MODELS
+
+
+@functools.lru_cache(maxsize=64)
+def _build_swe_prompt(tools_key: tuple, repos_key: tuple, branch: str, other_agents_info: str):
+    """
+    Build the SWE prompt with its static sections filled in.
+
+    Cached so agents set up with the same tools, repos, branch and sibling agents reuse one prompt.
+
+    Args:
+        tools_key: Tuple of (name, description) pairs for the agent's tools
+        repos_key: Tuple of available repository names
+        branch: Branch the agent works on
+        other_agents_info: Formatted description of sibling agents
+
+    Returns:
+        PromptTemplate: The partially formatted prompt
+    """
+    names_parts = []
+    desc_parts = []
+    for name, description in tools_key:
+        names_parts.append(name)
+        desc_parts.append(f"{name}: {description}")
+
+    return STRUCTURED_SWE_PROMPT.partial(
+        tools="\n".join(desc_parts),
+        tool_names=", ".join(names_parts),
+        available_repos=", ".join(repos_key),
+        branch=branch,
+        other_agents_info=other_agents_info,
+    )
 
 
 class SoftwareEngineerAgent:
@@ -109,7 +145,7 @@ class SoftwareEngineerAgent:
         # Setup clients and dependencies
         await self._setup_clients()
         await self._setup_toolbox(owner, repos, installation_id, branch, model_name)
-        self._setup_llm_and_logger(llm_client, model_name, fake_calls_path)
+        await self._setup_llm_and_logger(llm_client, model_name, fake_calls_path)
         await self._setup_graph(repos, branch)
 
         if self.live_logging:
@@ -137,10 +173,10 @@ class SoftwareEngineerAgent:
         if self.live_logging:
             print(f"Authentication complete. Branch '{branch}' ready.")
 
-    def _setup_llm_and_logger(self, llm_client, model_name, fake_calls_path=None):
+    async def _setup_llm_and_logger(self, llm_client, model_name, fake_calls_path=None):
         """Setup LLM client and logger."""
         if not self.logger:
-            self.logger = AgentLogger(
+            self.logger = await AgentLogger.create(
                 run_id=self.run_id,
             )
 
@@ -151,16 +187,13 @@ class SoftwareEngineerAgent:
             print(f'[DEBUG] Model {self.model_name} not found in {self.model_provider} models. May not be supported!')
             print('-'*50)
 
-        chat_client = chat_info['chat_class']
-        self.llm_client = chat_client(model=model_name, raw_logging=True)
+        self.llm_client = get_chat_client(self.model_provider, model_name, raw_logging=True)
 
 
         # Load fake responses if path is provided
         if fake_calls_path and os.path.exists(fake_calls_path):
             try:
-                with open(fake_calls_path, "r") as f:
-                    fake_calls = json.load(f)
-                for fake_call in fake_calls.get("fake_calls", []):
+                for fake_call in await load_fake_calls(fake_calls_path):
                     self.llm_client.add_fake_response(fake_call)
                 if self.live_logging:
                     print(f"Loaded fake responses from {fake_calls_path}")
@@ -170,17 +203,14 @@ class SoftwareEngineerAgent:
     async def _setup_graph(self, repos, branch):
         """Create and configure the agent graph."""
         tools = self.toolbox.get_all_tools()
-        tools_dict = {tool["name"]: tool for tool in tools}
-        tool_names = list(tools_dict.keys())
 
         other_agents_info = format_other_agents_info(self.other_agents)
 
-        prompt = STRUCTURED_SWE_PROMPT.partial(
-            tools="\n".join([f"{tool['name']}: {tool['description']}" for tool in tools]),
-            tool_names=", ".join(tool_names),
-            available_repos=", ".join(repos),
-            branch=branch,
-            other_agents_info=other_agents_info,
+        prompt = _build_swe_prompt(
+            tuple([(tool["name"], tool["description"]) for tool in tools]),
+            tuple(repos),
+            branch,
+            other_agents_info,
         )
 
         self.graph = create_agent_graph(
@@ -212,9 +242,12 @@ class SoftwareEngineerAgent:
         # Update run_id if provided
         if run_id:
             self.run_id = run_id
-            # Reinitialize the logger with the new run_id to ensure proper logging
-            self.logger = AgentLogger(run_id=run_id)
-            # Also update the logger in the graph to ensure all logs go to the correct place
+            # Point the logger at the new run_id so all logs go to the correct place
+            if self.logger:
+                await self.logger.rebind(run_id)
+            else:
+                self.logger = await AgentLogger.create(run_id=run_id)
+            # Also update the logger in the graph in case it was created above
             self.graph.logger = self.logger
 
         initial_state = AgentState(user_input=task_description)
@@ -225,7 +258,12 @@ class SoftwareEngineerAgent:
         # )
 
         config = create_run_config(self.run_id)
-        result = await self.graph.ainvoke(initial_state, config=config)
+        try:
+            result = await self.graph.ainvoke(initial_state, config=config)
+        finally:
+            # Persist whatever the logger is still holding before handing back control
+            if self.logger:
+                await self.logger.aclose()
 
         # print_run_end(self.live_logging)
 
@@ -235,15 +273,15 @@ class SoftwareEngineerAgent:
 async def debug_logs(run_id: str):
     """Retrieve and print logs from the SQLite database for debugging."""
     task_storage = TaskStorage()
-    logs = task_storage.load_log(run_id, "agent_logger")
+    summary = task_storage.load_log_summary(run_id, "agent_logger")
 
     print("\n==== AGENT LOGS FROM DATABASE ====")
     print(f"Run ID: {run_id}")
-    print("Last updated:", logs.get("last_updated", "N/A"))
-    print(f"Total messages: {len(logs.get('progress', []))}")
+    print("Last updated:", summary.get("last_updated") or "N/A")
+    print(f"Total messages: {summary.get('message_count') or 0}")
 
-    # Print log entries with timestamps
-    for i, message in enumerate(logs.get("progress", [])):
+    # Print log entries with timestamps, streamed one row at a time
+    for i, message in enumerate(task_storage.iter_log_progress(run_id, "agent_logger")):
         print(f"\n--- Message {i+1} ---")
         if isinstance(message, dict):
             for key, value in message.items():
@@ -5,10 +5,18 @@ The log document can be used to track the progress of an agent, by keeping runni
 All changes are automatically persisted to the database with debouncing for performance.
 """
 
+import asyncio
+import atexit
+import collections
+import queue
+import threading
 import time
 import logging
+import logging.handlers
 import os
 
+import orjson
+
 from task_storage import TaskStorage
 
 
@@ -20,13 +28,36 @@ log_file = os.path.join(log_dir, "langgraph.log")
 file_handler = logging.FileHandler(log_file)
 file_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
 
+# Records are handed to a background listener thread so callers never block on the file write
+log_queue = queue.SimpleQueue()
+log_listener = logging.handlers.QueueListener(log_queue, file_handler, respect_handler_level=True)
+log_listener.start()
+atexit.register(log_listener.stop)
+
 logger = logging.getLogger("langgraph")
 logger.setLevel(logging.INFO)
-logger.addHandler(file_handler)
+logger.addHandler(logging.handlers.QueueHandler(log_queue))
+
+
+class _LazyJSON:
+    """
+    Defers serializing a log message until a handler actually renders the record.
+    """
+
+    __slots__ = ("message",)
+
+    def __init__(self, message):
+        self.message = message
+
+    def __str__(self):
+        return orjson.dumps(self.message, default=str).decode()
 
 
 class AgentLogger:
 
+    # Messages logged within this window are persisted together in a single save
+    _flush_interval = 0.2
+
     def __init__(self, run_id: str, task_id: str = None):
         self.run_id = run_id
         self.task_id = task_id or run_id  # Default to run_id if task_id not provided
@@ -34,35 +65,149 @@ class AgentLogger:
 
         self.task_storage = TaskStorage()
 
+        # Messages waiting to be moved into the log document by the flush loop
+        self._pending = collections.deque()
+        self._flush_event = None
+        self._flush_task = None
+        # Flushes run on worker threads; one at a time keeps batches saved in the order they were logged
+        self._flush_lock = threading.Lock()
+
+        self._log_document = None
+        # (task_id, run_id) of the DB row backing the log document
+        self._log_key = None
         self._setup_log_document()
 
+    @classmethod
+    async def create(cls, run_id: str, task_id: str = None) -> "AgentLogger":
+        """
+        Create a logger from async code, running its database setup on a worker thread.
+        """
+        return await asyncio.to_thread(cls, run_id, task_id)
+
+    @property
+    def log_document(self):
+        """
+        The auto-persisting log document for the current run, loaded on first use after a rebind.
+        """
+        if self._log_document is None:
+            self._setup_log_document()
+        return self._log_document
+
+    async def rebind(self, run_id: str, task_id: str = None):
+        """
+        Point this logger at a different run without rebuilding it.
+
+        The background flush is stopped and messages still pending for the previous run are saved to
+        its log first; the new run's log document is only loaded (or created) when it is next needed.
+        """
+        task_id = task_id or run_id
+        if run_id == self.run_id and task_id == self.task_id:
+            return
+        await self.aclose()
+        self.run_id = run_id
+        self.task_id = task_id
+        self._log_document = None
+
     def load_log_document(self) -> dict:
         """
         Load the log document - returns the auto-persisting log dict.
         """
-        return dict(self.log_document)  # Return a regular dict copy for compatibility
+        log_document = dict(self.log_document)  # Return a regular dict copy for compatibility
+        if self._pending:
+            log_document["progress"] = [*log_document["progress"], *self._pending]
+        return log_document
 
     def log_message(self, message: dict):
         """
-        Update the log document with a new message - auto-saves to database!
+        Update the log document with a new message - saved to the database in batches by a background flush.
         """
-        self.log_document["progress"].append(message)
-        self.log_document["last_updated"] = time.strftime("%Y-%m-%d %H:%M:%S")
+        self._pending.append(message)
+
+        if self._flush_task is None or self._flush_task.done():
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                # No event loop to flush from, persist right away
+                self._flush_pending()
+                loop = None
+            if loop is not None:
+                self._flush_event = asyncio.Event()
+                self._flush_task = loop.create_task(self._flush_loop())
+        if self._flush_task is not None:
+            self._flush_event.set()
 
         # Also log to file
-        log_entry = f"Task: {self.task_id} | Run: {self.run_id} | Message: {message}"
-        logger.info(log_entry)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Task: %s | Run: %s | Message: %s", self.task_id, self.run_id, _LazyJSON(message))
+
+    async def aclose(self):
+        """
+        Stop the background flush and persist any messages still pending.
+        """
+        task, self._flush_task = self._flush_task, None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        if self._pending:
+            await asyncio.to_thread(self._flush_pending)
+
+    async def _flush_loop(self):
+        """
+        Wait for new messages, let a burst of them accumulate, then persist them with one save.
+        """
+        flush = None
+        try:
+            while True:
+                await self._flush_event.wait()
+                await asyncio.sleep(self._flush_interval)
+                self._flush_event.clear()
+                # Shielded so cancelling the loop doesn't abandon a save already running on a thread
+                flush = asyncio.ensure_future(asyncio.to_thread(self._flush_pending))
+                await asyncio.shield(flush)
+        except asyncio.CancelledError:
+            # Let an in-flight save finish, then don't drop messages logged right before shutdown
+            if flush is not None:
+                await asyncio.wait([flush])
+            await asyncio.to_thread(self._flush_pending)
+            raise
+
+    def _flush_pending(self):
+        """
+        Move pending messages into the log document and save it once.
+        """
+        with self._flush_lock:
+            if not self._pending:
+                return
+            # Resolve the target log before taking the batch, so it is saved to the run it was logged for
+            log_document = self.log_document
+            task_id, run_id = self._log_key
+            batch = []
+            while self._pending:
+                batch.append(self._pending.popleft())
+            last_updated = time.strftime("%Y-%m-%d %H:%M:%S")
+            # Update the in-memory copy without triggering its auto-save; the batch is appended in the DB directly
+            log_document["progress"].extend(batch)
+            dict.__setitem__(log_document, "last_updated", last_updated)
+            try:
+                self.task_storage.append_log_progress(task_id, run_id, "agent_logger", batch, last_updated)
+            except Exception as e:
+                logger.error(f"Failed to save log progress for Task: {task_id} | Run: {run_id}: {e}")
 
     def _setup_log_document(self):
         """
         Setup the auto-persisting log document.
         """
+        self._log_key = (self.task_id, self.run_id)
+
         # Try to load existing log from database
         existing_log = self.task_storage.load_log(self.run_id, "agent_logger")
 
         if existing_log:
             # Create auto-persisting log from existing data
-            self.log_document = self.task_storage.create_log_persistent(
+            self._log_document = self.task_storage.create_log_persistent(
                 self.task_id, self.run_id, "agent_logger", existing_log
             )
         else:
@@ -73,7 +218,7 @@ class AgentLogger:
                 "last_updated": time.strftime("%Y-%m-%d %H:%M:%S"),
                 "progress": []
             }
-            self.log_document = self.task_storage.create_log_persistent(
+            self._log_document = self.task_storage.create_log_persistent(
                 self.task_id, self.run_id, "agent_logger", initial_log_data
             )
 
@@ -81,4 +226,4 @@ class AgentLogger:
             self.task_storage.add_run_id_to_task(self.task_id, self.run_id)
 
             # Log initialization to file
-            logger.info(f"Initialized logger for Task: {self.task_id} | Run: {self.run_id}")
+            logger.info("Initialized logger for Task: %s | Run: %s", self.task_id, self.run_id)
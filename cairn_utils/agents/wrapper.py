@@ -61,12 +61,12 @@ SWE:
 """
 
 
+import asyncio
+import functools
 import os
 import time
-import traceback
 import logging
 import json
-from dotenv import load_dotenv
 
 from .fullstack_planner import ExplorerAgent
 from .pm import ProjectManagerAgent
@@ -77,6 +77,121 @@ from ..supported_models import find_supported_model_given_model_name
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Agent class for each agent type, the method that runs a task, and the setup kwargs that differ between them
+_AGENTS = {
+    "SWE": (
+        SoftwareEngineerAgent,
+        "implement_task",
+        lambda payload, branch, other_agents: {
+            "repos": [payload.get("repo")],
+            "branch": branch,
+            "other_agents": other_agents or None,
+        },
+    ),
+    "PM": (
+        ProjectManagerAgent,
+        "run",
+        lambda payload, branch, other_agents: {
+            "repos": [payload.get("repo")],
+            "branch": branch,
+            "other_agents": other_agents or None,
+        },
+    ),
+    "Fullstack Planner": (
+        ExplorerAgent,
+        "run",
+        lambda payload, branch, other_agents: {
+            "repos": payload.get("repos", []),
+            "branch": None,
+        },
+    ),
+}
+
+# Prefix of the generated run ID for each agent type
+_RUN_ID_PREFIXES = {
+    "SWE": "swe_run_",
+    "PM": "pm_run_",
+    "Fullstack Planner": "fullstack_run_",
+}
+
+# (epoch second, formatted "%Y-%m-%d %H:%M:%S") of the most recent payload timestamp
+_last_ts = (None, "")
+
+
+def _now_str() -> str:
+    """Local time as "%Y-%m-%d %H:%M:%S", only running strftime when the second changes."""
+    global _last_ts
+    second = int(time.time())
+    if second != _last_ts[0]:
+        _last_ts = (second, time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(second)))
+    return _last_ts[1]
+
+
+@functools.lru_cache(maxsize=1)
+def _load_env():
+    """Load .env once per process instead of re-reading it for every agent run."""
+    from dotenv import load_dotenv
+
+    load_dotenv()
+
+
+@functools.lru_cache(maxsize=1)
+def _get_task_storage() -> TaskStorage:
+    """Shared TaskStorage, so its schema setup runs once. Each call opens its own connection, so sharing is safe."""
+    return TaskStorage()
+
+
+@functools.lru_cache(maxsize=4)
+def _read_repo_data(path: str, mtime_ns: int) -> dict:
+    """Parse repos.json, keyed on its mtime so edits are picked up without re-parsing it for every run."""
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def _get_other_agents(payload: dict, parent_payload: dict) -> list:
+    """
+    Describe the other subtasks of the parent fullstack task, for agents to coordinate with.
+
+    Args:
+        payload: This agent's payload, with its subtask_index and sibling_subtask_ids
+        parent_payload: The parent fullstack task's payload, or None if it wasn't found
+
+    Returns:
+        list: Dicts with run_id, repo and description for every subtask except this one
+    """
+    if not parent_payload:
+        return []
+
+    # If parent task has output with subtask information, extract it
+    agent_output = parent_payload.get("agent_output", {})
+    if not agent_output or "list_of_subtasks" not in agent_output:
+        return []
+
+    # Extract subtask info from parent's output
+    subtasks = agent_output.get("list_of_subtasks", [])
+    subtask_repos = agent_output.get("list_of_subtask_repos", [])
+    sibling_subtask_ids = payload["sibling_subtask_ids"]
+
+    # Skip the lists entirely if our index is unusable or they don't describe the same subtasks
+    subtask_index = payload.get("subtask_index")
+    if (
+        subtask_index is None
+        or not 0 <= subtask_index < len(subtasks)
+        or len(sibling_subtask_ids) != len(subtasks)
+        or len(subtask_repos) != len(subtasks)
+    ):
+        return []
+
+    # get all except for the current index subtask
+    return [
+        {"run_id": subtask_id, "repo": repo, "description": description}
+        for i, (subtask_id, repo, description) in enumerate(
+            zip(sibling_subtask_ids, subtask_repos, subtasks)
+        )
+        if i != subtask_index
+    ]
+
+
 async def wrapper(payload: dict) -> dict:
     """
     Unified wrapper for all agent types: SWE, PM, and Fullstack Planner.
@@ -86,23 +201,22 @@ async def wrapper(payload: dict) -> dict:
     if not agent_type:
         payload.update({
             "agent_status": "Failed",
-            "updated_at": time.strftime("%Y-%m-%d %H:%M:%S")
+            "updated_at": _now_str()
         })
         print("ERROR: No agent_type specified in payload")
         return payload
 
     # Load environment variables
-    load_dotenv()
+    _load_env()
 
     # Load repository configurations
     try:
-        with open("repos.json", "r") as f:
-            repo_data = json.load(f)
+        repo_data = _read_repo_data("repos.json", os.stat("repos.json").st_mtime_ns)
     except (FileNotFoundError, json.JSONDecodeError) as e:
         payload.update({
             "agent_status": "Failed",
             "error": f"Error loading or parsing repos.json: {e}",
-            "updated_at": time.strftime("%Y-%m-%d %H:%M:%S")
+            "updated_at": _now_str()
         })
         print(f"ERROR: Could not load or parse repos.json: {e}")
         return payload
@@ -111,12 +225,13 @@ async def wrapper(payload: dict) -> dict:
     owner = payload.get("owner")
     repo_name = payload.get("repo") # For SWE/PM
     repo_names = payload.get("repos", []) # For Fullstack Planner
+    description = payload.get("description")
 
     if not owner:
         payload.update({
             "agent_status": "Failed",
             "error": "Owner not specified in payload",
-            "updated_at": time.strftime("%Y-%m-%d %H:%M:%S")
+            "updated_at": _now_str()
         })
         print("ERROR: Owner not specified in payload")
         return payload
@@ -127,7 +242,7 @@ async def wrapper(payload: dict) -> dict:
         payload.update({
             "agent_status": "Failed",
             "error": "No repository specified in payload",
-            "updated_at": time.strftime("%Y-%m-%d %H:%M:%S")
+            "updated_at": _now_str()
         })
         print("ERROR: No repository specified in payload")
         return payload
@@ -144,24 +259,22 @@ async def wrapper(payload: dict) -> dict:
         payload.update({
             "agent_status": "Failed",
             "error": error_msg,
-            "updated_at": time.strftime("%Y-%m-%d %H:%M:%S")
+            "updated_at": _now_str()
         })
         print(f"ERROR: {error_msg}")
         return payload
 
+    # One timestamp for the generated run ID and branch info
+    timestamp = int(time.time())
+
     # Create a unique run ID if not provided
     if not payload.get("run_id"):
-        timestamp = int(time.time())
-        if agent_type == "SWE":
-            run_id = f"swe_run_{timestamp}"
-        elif agent_type == "PM":
-            run_id = f"pm_run_{timestamp}"
-        elif agent_type == "Fullstack Planner":
-            run_id = f"fullstack_run_{timestamp}"
-        else:
+        try:
+            run_id = f"{_RUN_ID_PREFIXES[agent_type]}{timestamp}"
+        except KeyError:
             payload.update({
                 "agent_status": "Failed",
-                "updated_at": time.strftime("%Y-%m-%d %H:%M:%S")
+                "updated_at": _now_str()
             })
             print(f"ERROR: Unsupported agent_type: {agent_type}")
             return payload
@@ -172,47 +285,18 @@ async def wrapper(payload: dict) -> dict:
     has_sibling_subtasks = 'sibling_subtask_ids' in payload and payload['sibling_subtask_ids']
 
 
-    other_agents = []
-
+    # Start fetching the parent fullstack task now; it is only needed once the agent is set up
+    parent_fetch = None
     if has_sibling_subtasks:
-        # get the subtask_ids from the payload
         parent_fullstack_id = payload.get("parent_fullstack_id")
-
-        # Initialize task storage to get information about sibling subtasks
-        task_storage = TaskStorage()
-
-        # First try to get the parent fullstack task info
         if parent_fullstack_id:
-            parent_payload = task_storage.get_active_task(parent_fullstack_id)
-
-            if parent_payload:
-                # If parent task has output with subtask information, extract it
-                agent_output = parent_payload.get("agent_output", {})
-                if agent_output and "list_of_subtasks" in agent_output:
-                    subtask_index = payload.get("subtask_index")
-                    if subtask_index is not None:
-
-                        # Extract subtask info from parent's output
-                        subtasks = agent_output.get("list_of_subtasks", [])
-                        subtask_titles = agent_output.get("list_of_subtask_titles", [])
-                        subtask_repos = agent_output.get("list_of_subtask_repos", [])
-
-                        # get all except for the current index subtask
-                        for i in range(len(subtasks)):
-                            if i != subtask_index:
-                                subtask_id = payload.get("sibling_subtask_ids")[i]
-                                other_agents.append({
-                                    "run_id": subtask_id,
-                                    "repo": subtask_repos[i],
-                                    "description": subtasks[i]
-                                })
+            parent_fetch = asyncio.create_task(_get_task_storage().aget_active_task(parent_fullstack_id))
 
     # Handle branch creation for SWE and PM agents
     branch = None
     if agent_type in ["SWE", "PM"]:
         if not payload.get("branch"):
             branch = run_id
-            timestamp = int(time.time())
             payload["branch"] = branch
 
             # Log branch info to JSON file
@@ -231,7 +315,7 @@ async def wrapper(payload: dict) -> dict:
 
     payload.update({
         "agent_status": "Running",
-        "updated_at": time.strftime("%Y-%m-%d %H:%M:%S")
+        "updated_at": _now_str()
     })
 
     # Create and setup the appropriate agent
@@ -249,94 +333,72 @@ async def wrapper(payload: dict) -> dict:
         if not model_provider:
             model_provider = provider
 
-        if agent_type == "SWE":
-            agent = SoftwareEngineerAgent()
-            await agent.setup(
-                owner=payload.get("owner"),
-                repos=[payload.get("repo")],
-                installation_id=installation_id,
-                branch=branch,
-                live_logging=False,
-                run_id=run_id,
-                subtask_id=None,
-                model_provider=model_provider,
-                model_name=model_name,
-                running_locally=True,
-                other_agents=other_agents if other_agents else None
-            )
-        elif agent_type == "PM":
-            agent = ProjectManagerAgent()
-            await agent.setup(
-                owner=payload.get("owner"),
-                repos=[payload.get("repo")],
-                installation_id=installation_id,
-                branch=branch,
-                live_logging=False,
-                run_id=run_id,
-                subtask_id=None,
-                model_provider=model_provider,
-                model_name=model_name,
-                running_locally=True,
-                other_agents=other_agents if other_agents else None
-            )
-        elif agent_type == "Fullstack Planner":
-            agent = ExplorerAgent()
-            await agent.setup(
-                owner=payload.get("owner"),
-                repos=payload.get("repos", []),
-                installation_id=installation_id,
-                branch=None,
-                live_logging=False,
-                run_id=run_id,
-                subtask_id=None,
-                model_provider=model_provider,
-                model_name=model_name,
-                running_locally=True,
-            )
+        # Sibling subtasks of the same fullstack plan, for coordination
+        other_agents = _get_other_agents(payload, await parent_fetch) if parent_fetch else []
+
+        try:
+            agent_class, run_method, agent_kwargs = _AGENTS[agent_type]
+        except KeyError:
+            raise ValueError(f"Unsupported agent_type: {agent_type}")
+
+        agent = agent_class()
+        await agent.setup(
+            owner=owner,
+            installation_id=installation_id,
+            live_logging=False,
+            run_id=run_id,
+            subtask_id=None,
+            model_provider=model_provider,
+            model_name=model_name,
+            running_locally=True,
+            **agent_kwargs(payload, branch, other_agents),
+        )
 
         # Run the agent
-        final_state = await agent.implement_task(payload.get("description")) if agent_type == "SWE" else await agent.run(payload.get("description"))
+        final_state = await getattr(agent, run_method)(description)
         generated_output = final_state['tool_outputs'][-1]['tool_output']
 
-        payload.update({
+        # Collect every completion field first so the (auto-persisting) payload is written once
+        completion = {
             "agent_output": generated_output,
             "agent_status": "Completed",
-            "updated_at": time.strftime("%Y-%m-%d %H:%M:%S")
-        })
+        }
 
         # If this is a completed Fullstack Planner task, pre-generate subtask IDs
-        if agent_type == "Fullstack Planner" and payload.get("agent_status") == "Completed":
+        if agent_type == "Fullstack Planner":
             try:
                 # Extract subtask information
                 subtasks = generated_output.get("list_of_subtasks", [])
                 if subtasks:
-                    # Initialize TaskStorage
-                    task_storage = TaskStorage()
-
                     # Pre-generate and store subtask IDs
-                    generated_ids = task_storage.pre_generate_subtask_ids(
+                    generated_ids = await _get_task_storage().apre_generate_subtask_ids(
                         fullstack_run_id=run_id,
                         num_subtasks=len(subtasks)
                     )
 
                     # Add the generated IDs to the payload
-                    payload["subtask_ids"] = [item["subtask_id"] for item in generated_ids]
+                    completion["subtask_ids"] = [item["subtask_id"] for item in generated_ids]
 
                     logger.info(f"Pre-generated {len(generated_ids)} subtask IDs for Fullstack Planner task {run_id}")
             except Exception as e:
                 logger.error(f"Error pre-generating subtask IDs: {e}")
                 # Continue even if there's an error - we don't want to fail the task
 
+        completion["updated_at"] = _now_str()
+        payload.update(completion)
+
         return payload
 
     except Exception as e:
-        print(f"ERROR: Exception in wrapper: {e}")
-        print(traceback.format_exc())
+        if parent_fetch:
+            parent_fetch.cancel()
+        # The traceback is only rendered if a handler actually emits the record
+        logger.exception("Exception in wrapper: %s", e)
 
         payload.update({
             "agent_status": "Failed",
             "error": str(e),
-            "updated_at": time.strftime("%Y-%m-%d %H:%M:%S")
+            "updated_at": _now_str()
         })
         return payload
 
@@ -349,8 +411,6 @@ async def swe_wrapper(payload: dict) -> dict:
     return await wrapper(payload)
 
 if __name__ == "__main__":
-    import asyncio
-
     # Example payloads for testing different agent types
 
     # SWE agent example
@@ -1,7 +1,9 @@
 import asyncio
 import base64
-import difflib
-import json
+import collections
+import functools
+import importlib.util
+import operator
 import os
 import re
 import time
@@ -11,11 +13,9 @@ from typing import Dict, Optional
 
 import httpx
 import jwt
-import requests
-from dateutil import parser
-from diff_match_patch import diff_match_patch
+import orjson
+from cryptography.hazmat.primitives import serialization
 from dotenv import load_dotenv
-from fuzzywuzzy import fuzz
 
 """
 NOTE: Understanding Github Auth Flow!
@@ -39,6 +39,119 @@ PRIVATE_KEY_PATH = APP_DIR / PEM_FILE_PATH
 print(f"PEM FILE PATH: {PEM_FILE_PATH}")
 print(f"PRIVATE KEY PATH: {PRIVATE_KEY_PATH}")
 
+# Strings made only of these characters are left unchanged by urllib.parse.quote(..., safe="")
+_UNRESERVED_RE = re.compile(r"[A-Za-z0-9_.~-]*")
+
+# Deletes the ASCII control characters, quotes and backslashes that _sanitize strips
+_PATH_TRANS = str.maketrans(
+    {c: None for c in range(128) if not chr(c).isprintable()} | dict.fromkeys(map(ord, "\"'\\"), None)
+)
+
+# The app's private key, parsed from its PEM file on first use
+_PRIVATE_KEY = None
+# (app JWT, expiry epoch seconds) of the last generated token
+_jwt_cache: Optional[tuple[str, float]] = None
+_JWT_EXPIRY_MARGIN = 30
+# installation_id -> (installation access token, expiry epoch seconds)
+_install_token_cache: dict[int, tuple[str, float]] = {}
+_INSTALL_TOKEN_EXPIRY_MARGIN = 60
+
+# HTTP client shared by every GitHub call in the current event loop, so connections to
+# api.github.com are kept alive and reused instead of re-doing the TCP/TLS handshake per request
+_CLIENT: Optional[httpx.AsyncClient] = None
+_CLIENT_LOOP: Optional[asyncio.AbstractEventLoop] = None
+# HTTP/2 lets concurrent requests share one multiplexed connection; it needs the optional h2 package (httpx[http2])
+_HTTP2 = importlib.util.find_spec("h2") is not None
+# (Authorization, url, Accept, params) -> (ETag, body) of recent GET responses, least recently used first;
+# keyed by token so one installation's responses are never served for another's request
+_etag_cache: "collections.OrderedDict[tuple, tuple[str, bytes]]" = collections.OrderedDict()
+_etag_cache_bytes = 0  # Total size of the cached bodies
+_ETAG_CACHE_SIZE = 1024
+_ETAG_CACHE_MAX_BYTES = 32 * 1024 * 1024
+# Larger bodies (big files, huge recursive trees) are not cached at all
+_ETAG_CACHE_MAX_BODY = 1024 * 1024
+# Cap on concurrent directory listings in get_all_file_paths, to stay under GitHub's secondary rate limits
+_LISTING_CONCURRENCY = 20
+
+
+def _client() -> httpx.AsyncClient:
+    """
+    Return the shared GitHub HTTP client, creating it if missing, closed, or from another event loop.
+    """
+    global _CLIENT, _CLIENT_LOOP
+    loop = asyncio.get_running_loop()
+    if _CLIENT is None or _CLIENT.is_closed or _CLIENT_LOOP is not loop:
+        _CLIENT = httpx.AsyncClient(
+            base_url="https://api.github.com",
+            http2=_HTTP2,
+            timeout=httpx.Timeout(30.0),
+            limits=httpx.Limits(max_connections=1000, max_keepalive_connections=100),
+        )
+        _CLIENT_LOOP = loop
+    return _CLIENT
+
+
+async def _get(url: str, headers: dict, params: dict = None) -> bytes:
+    """
+    GET a GitHub API URL on the shared client and return the response body.
+
+    Bodies are cached with their ETag and revalidated with If-None-Match; GitHub answers an
+    unchanged resource with 304 Not Modified (no body, and not counted against the rate limit),
+    in which case the cached body is returned.
+
+    Raises:
+        httpx.HTTPStatusError: If the request fails
+    """
+    global _etag_cache_bytes
+    key = (
+        headers.get("Authorization"),
+        url,
+        headers.get("Accept"),
+        tuple(sorted(params.items())) if params else None,
+    )
+    cached = _etag_cache.get(key)
+    if cached is not None:
+        headers = {**headers, "If-None-Match": cached[0]}
+
+    res = await _client().get(url, headers=headers, params=params)
+    if res.status_code == 304 and cached is not None:
+        _etag_cache.move_to_end(key)
+        return cached[1]
+    res.raise_for_status()
+
+    etag = res.headers.get("ETag")
+    # Re-read the entry: other requests may have replaced or evicted it while this one was in flight
+    stale = _etag_cache.pop(key, None)
+    if stale is not None:
+        _etag_cache_bytes -= len(stale[1])
+    if etag and len(res.content) <= _ETAG_CACHE_MAX_BODY:
+        _etag_cache[key] = (etag, res.content)
+        _etag_cache_bytes += len(res.content)
+        while len(_etag_cache) > _ETAG_CACHE_SIZE or _etag_cache_bytes > _ETAG_CACHE_MAX_BYTES:
+            _etag_cache_bytes -= len(_etag_cache.popitem(last=False)[1][1])
+    return res.content
+
+
+@functools.lru_cache(maxsize=1)
+def _get_dmp():
+    """
+    diff-match-patch instance shared by every apply_unified_diffs call, imported on first use.
+    """
+    from diff_match_patch import diff_match_patch
+
+    return diff_match_patch()
+
+
+async def close_client():
+    """
+    Close the shared GitHub HTTP client, if it belongs to the running loop. Call on shutdown.
+    """
+    global _CLIENT, _CLIENT_LOOP
+    client, _CLIENT = _CLIENT, None
+    if client is not None and not client.is_closed and _CLIENT_LOOP is asyncio.get_running_loop():
+        await client.aclose()
+    _CLIENT_LOOP = None
+
 
 async def list_installations(jwt_token: str):
     """
@@ -51,51 +164,102 @@ async def list_installations(jwt_token: str):
         "Authorization": f"Bearer {jwt_token}",
         "Accept": "application/vnd.github+json",
     }
-    async with httpx.AsyncClient() as client:
-        res = await client.get(
-            "https://api.github.com/app/installations", headers=headers
-        )
-        res.raise_for_status()
-        return res.json()
+    client = _client()
+    res = await client.get(
+        "/app/installations", headers=headers
+    )
+    res.raise_for_status()
+    return orjson.loads(res.content)
+
+
+def _sanitize(path: Optional[str]) -> str:
+    """
+    Strip surrounding whitespace, then remove non-printable characters, quotes and backslashes.
+    """
+    if path is None:
+        return ""
+    path = path.strip().translate(_PATH_TRANS)
+    if not path.isprintable():
+        # Rare non-ASCII control/format characters, which the table doesn't cover
+        path = "".join(char for char in path if char.isprintable())
+    return path
+
+
+def _fastquote(value: str) -> str:
+    """
+    URL-encode a path segment like urllib.parse.quote(value, safe=""), skipping the work when nothing needs escaping.
+    """
+    if _UNRESERVED_RE.fullmatch(value):
+        return value
+    return urllib.parse.quote(value, safe="")
+
+
+def _load_private_key():
+    """
+    Read and parse the GitHub App private key once, so signing a JWT doesn't re-parse the PEM.
+    """
+    global _PRIVATE_KEY
+    if _PRIVATE_KEY is None:
+        with open(PRIVATE_KEY_PATH, "rb") as f:
+            _PRIVATE_KEY = serialization.load_pem_private_key(f.read(), password=None)
+    return _PRIVATE_KEY
 
 
 def generate_jwt():
     """
     Generate a JWT token for GitHub App authentication using the private key.
 
+    The token is reused until it is about to expire, so repeated calls don't re-sign.
+
     Example:
         jwt_token = generate_jwt()
     """
-    with open(PRIVATE_KEY_PATH, "r") as f:
-        private_key = f.read()
+    global _jwt_cache
+    now = time.time()
+    if _jwt_cache is not None and now < _jwt_cache[1] - _JWT_EXPIRY_MARGIN:
+        return _jwt_cache[0]
 
     payload = {
-        "iat": int(time.time()) - 60,
-        "exp": int(time.time()) + (10 * 5),
+        "iat": int(now) - 60,
+        "exp": int(now) + (10 * 5),
         "iss": int(APP_ID),
     }
 
-    return jwt.encode(payload, private_key, algorithm="RS256")
+    jwt_token = jwt.encode(payload, _load_private_key(), algorithm="RS256")
+    _jwt_cache = (jwt_token, payload["exp"])
+    return jwt_token
 
 
 async def get_installation_token(jwt_token: str, installation_id: int):
     """
     Get an installation access token for a specific GitHub App installation.
 
+    Tokens are cached per installation and reused until shortly before GitHub expires them.
+
     Example:
         token = await get_installation_token("eyJhbGciOiJSUzI1NiJ9...", 12345678)
     """
+    cached = _install_token_cache.get(installation_id)
+    if cached is not None and time.time() < cached[1] - _INSTALL_TOKEN_EXPIRY_MARGIN:
+        return cached[0]
+
     headers = {
         "Authorization": f"Bearer {jwt_token}",
         "Accept": "application/vnd.github+json",
     }
-    async with httpx.AsyncClient() as client:
-        res = await client.post(
-            f"https://api.github.com/app/installations/{installation_id}/access_tokens",
-            headers=headers,
-        )
-        res.raise_for_status()
-        return res.json()["token"]
+    client = _client()
+    res = await client.post(
+        f"/app/installations/{installation_id}/access_tokens",
+        headers=headers,
+    )
+    res.raise_for_status()
+    data = orjson.loads(res.content)
+    token = data["token"]
+    if data.get("expires_at"):
+        from dateutil import parser
+
+        _install_token_cache[installation_id] = (token, parser.isoparse(data["expires_at"]).timestamp())
+    return token
 
 
 async def read_file_from_repo(
@@ -132,93 +296,54 @@ async def read_file_from_repo(
     }
 
     # Sanitize path: remove whitespace, newlines and other control characters
-    if path is not None:
-        path = path.strip()
-        # Remove any non-printable ASCII characters, quotes, and backslashes
-        path = "".join(
-            char for char in path if char.isprintable() and char not in ('"', "'", "\\")
-        )
-    else:
-        path = ""
+    path = _sanitize(path)
 
     # URL encode the path properly
-    encoded_path = urllib.parse.quote(path, safe="")
+    encoded_path = _fastquote(path)
 
-    url = f"https://api.github.com/repos/{owner}/{repo}/contents/{encoded_path}"
+    url = f"/repos/{owner}/{repo}/contents/{encoded_path}"
 
     # Add branch parameter if specified
     if branch:
         # Sanitize branch name
-        branch = branch.strip()
-        branch = "".join(
-            char
-            for char in branch
-            if char.isprintable() and char not in ('"', "'", "\\")
-        )
+        branch = _sanitize(branch)
         # URL encode the branch properly
-        encoded_branch = urllib.parse.quote(branch, safe="")
+        encoded_branch = _fastquote(branch)
         url += f"?ref={encoded_branch}"
 
-    async with httpx.AsyncClient() as client:
-        res = await client.get(url, headers=headers)
-        res.raise_for_status()
-        content = res.text
-
-        # Split content into lines
-        lines = content.split("\n")
-        total_lines = len(lines)
-
-        # Process line range if specified
-        if line_start is not None or line_end is not None:
-            # Default values if not specified
-            start = max(1, line_start or 1) - 1  # Convert to 0-indexed
-            end = min(
-                total_lines, line_end or total_lines
-            )  # Use total lines if not specified
-
-            # Add context information if partial read
-            if start > 0 or end < total_lines:
-                result_lines = []
-
-                # Add header if not starting from first line
-                if start > 0:
-                    result_lines.append(
-                        f"[...] {start} lines omitted at the beginning [...]"
-                    )
+    content = (await _get(url, headers)).decode("utf-8", "replace")
 
-                # Add the selected lines
-                result_lines.extend(lines[start:end])
+    # Whole file without line numbers: nothing to split or rejoin
+    if line_start is None and line_end is None and not add_line_numbers:
+        return content
 
-                # Add footer if not ending at last line
-                if end < total_lines:
-                    result_lines.append(
-                        f"[...] {total_lines - end} lines omitted at the end [...]"
-                    )
+    # Split content into lines
+    lines = content.split("\n")
+    total_lines = len(lines)
 
-                lines = result_lines
-
-        # Add line numbers if requested
-        if add_line_numbers:
-            # If we're showing a range and not the whole file, show actual line numbers
-            if line_start is not None or line_end is not None:
-                start = max(1, line_start or 1)
-                numbered_lines = []
-                for i, line in enumerate(lines):
-                    # Skip header/footer placeholder lines
-                    if "[...] lines omitted" in line:
-                        numbered_lines.append(line)
-                    else:
-                        # Width based on the highest line number we'll display
-                        width = len(str(end))
-                        numbered_lines.append(f"{start + i:{width}d}: {line}")
-                lines = numbered_lines
-            else:
-                # Normal line numbering for full file
-                width = len(str(len(lines)))
-                lines = [f"{i + 1:{width}d}: {line}" for i, line in enumerate(lines)]
+    # Default to the whole file when no range is specified
+    start = max(1, line_start or 1) - 1  # Convert to 0-indexed
+    end = min(total_lines, line_end or total_lines)
 
-        content = "\n".join(lines)
-        return content
+    result_lines = []
+
+    # Add header if not starting from first line
+    if start > 0:
+        result_lines.append(f"[...] {start} lines omitted at the beginning [...]")
+
+    # Add the selected lines, numbered with their actual line numbers if requested
+    if add_line_numbers:
+        # Width based on the highest line number we'll display
+        width = len(str(end))
+        result_lines.extend(f"{n + 1:{width}d}: {lines[n]}" for n in range(start, end))
+    else:
+        result_lines.extend(lines[start:end])
+
+    # Add footer if not ending at last line
+    if end < total_lines:
+        result_lines.append(f"[...] {total_lines - end} lines omitted at the end [...]")
+
+    return "\n".join(result_lines)
 
 
 async def list_repos_for_installation(token: str):
@@ -232,12 +357,7 @@ async def list_repos_for_installation(token: str):
         "Authorization": f"token {token}",
         "Accept": "application/vnd.github+json",
     }
-    async with httpx.AsyncClient() as client:
-        res = await client.get(
-            "https://api.github.com/installation/repositories", headers=headers
-        )
-        res.raise_for_status()
-        return res.json()["repositories"]
+    return orjson.loads(await _get("/installation/repositories", headers))["repositories"]
 
 
 async def list_files_in_repo(
@@ -271,44 +391,30 @@ async def list_files_in_repo(
     }
 
     # Sanitize path: remove whitespace, newlines and other control characters
-    if path is not None:
-        path = path.strip()
-        # Remove any non-printable ASCII characters, quotes, and backslashes
-        path = "".join(
-            char for char in path if char.isprintable() and char not in ('"', "'", "\\")
-        )
-    else:
-        path = ""
+    path = _sanitize(path)
 
     # URL encode the path properly
-    encoded_path = urllib.parse.quote(path, safe="")
+    encoded_path = _fastquote(path)
 
-    url = f"https://api.github.com/repos/{owner}/{repo}/contents/{encoded_path}"
+    url = f"/repos/{owner}/{repo}/contents/{encoded_path}"
 
     # Add branch parameter if specified
     if branch:
         # Sanitize branch name
-        branch = branch.strip()
-        branch = "".join(
-            char
-            for char in branch
-            if char.isprintable() and char not in ('"', "'", "\\")
-        )
+        branch = _sanitize(branch)
         # URL encode the branch properly
-        encoded_branch = urllib.parse.quote(branch, safe="")
+        encoded_branch = _fastquote(branch)
         url += f"?ref={encoded_branch}"
 
-    async with httpx.AsyncClient() as client:
-        res = await client.get(url, headers=headers)
-        res.raise_for_status()
+    items = orjson.loads(await _get(url, headers))
 
-        if sparse:
-            return [
-                {"name": item["name"], "path": item["path"], "type": item["type"]}
-                for item in res.json()
-            ]
-        else:
-            return res.json()
+    if sparse:
+        return [
+            {"name": item["name"], "path": item["path"], "type": item["type"]}
+            for item in items
+        ]
+    else:
+        return items
 
 
 async def get_default_branch_sha(token, owner, repo):
@@ -322,20 +428,14 @@ async def get_default_branch_sha(token, owner, repo):
         "Authorization": f"token {token}",
         "Accept": "application/vnd.github+json",
     }
-    async with httpx.AsyncClient() as client:
-        repo_info = await client.get(
-            f"https://api.github.com/repos/{owner}/{repo}", headers=headers
-        )
-        repo_info.raise_for_status()
-        default_branch = repo_info.json()["default_branch"]
+    repo_info = await _get(f"/repos/{owner}/{repo}", headers)
+    default_branch = orjson.loads(repo_info)["default_branch"]
 
-        branch_info = await client.get(
-            f"https://api.github.com/repos/{owner}/{repo}/branches/{default_branch}",
-            headers=headers,
-        )
-        branch_info.raise_for_status()
-        sha = branch_info.json()["commit"]["sha"]
-        return default_branch, sha
+    branch_info = await _get(
+        f"/repos/{owner}/{repo}/branches/{default_branch}", headers
+    )
+    sha = orjson.loads(branch_info)["commit"]["sha"]
+    return default_branch, sha
 
 
 async def create_branch(token, owner, repo, new_branch_name, base_sha):
@@ -348,21 +448,22 @@ async def create_branch(token, owner, repo, new_branch_name, base_sha):
     headers = {
         "Authorization": f"token {token}",
         "Accept": "application/vnd.github+json",
+        "Content-Type": "application/json",
     }
     data = {"ref": f"refs/heads/{new_branch_name}", "sha": base_sha}
-    async with httpx.AsyncClient() as client:
-        res = await client.post(
-            f"https://api.github.com/repos/{owner}/{repo}/git/refs",
-            headers=headers,
-            json=data,
-        )
-        res.raise_for_status()
-        return res.json()
+    client = _client()
+    res = await client.post(
+        f"/repos/{owner}/{repo}/git/refs",
+        headers=headers,
+        content=orjson.dumps(data),
+    )
+    res.raise_for_status()
+    return orjson.loads(res.content)
 
 
 async def update_file(token, owner, repo, branch, path, new_content, file_sha):
     """
-    Update a file in a GitHub repository with new content.
+    Update a file in a GitHub repository with new content (text or raw bytes).
 
     Example:
         result = await update_file(
@@ -378,22 +479,17 @@ async def update_file(token, owner, repo, branch, path, new_content, file_sha):
     headers = {
         "Authorization": f"token {token}",
         "Accept": "application/vnd.github+json",
+        "Content-Type": "application/json",
     }
 
     # Sanitize path
-    if path is not None:
-        path = path.strip()
-        # Remove any non-printable ASCII characters, quotes, and backslashes
-        path = "".join(
-            char for char in path if char.isprintable() and char not in ('"', "'", "\\")
-        )
-    else:
-        path = ""
+    path = _sanitize(path)
 
     # URL encode the path properly
-    encoded_path = urllib.parse.quote(path, safe="")
+    encoded_path = _fastquote(path)
 
-    content_encoded = base64.b64encode(new_content.encode()).decode()
+    raw = new_content if isinstance(new_content, (bytes, bytearray)) else new_content.encode()
+    content_encoded = base64.b64encode(raw).decode("ascii")
 
     data = {
         "message": "Update file via GitHub App",
@@ -402,14 +498,14 @@ async def update_file(token, owner, repo, branch, path, new_content, file_sha):
         "branch": branch,
     }
 
-    async with httpx.AsyncClient() as client:
-        res = await client.put(
-            f"https://api.github.com/repos/{owner}/{repo}/contents/{encoded_path}",
-            headers=headers,
-            json=data,
-        )
-        res.raise_for_status()
-        return res.json()
+    client = _client()
+    res = await client.put(
+        f"/repos/{owner}/{repo}/contents/{encoded_path}",
+        headers=headers,
+        content=orjson.dumps(data),
+    )
+    res.raise_for_status()
+    return orjson.loads(res.content)
 
 
 async def create_pull_request(token, owner, repo, head, base, title, body):
@@ -430,18 +526,19 @@ async def create_pull_request(token, owner, repo, head, base, title, body):
     headers = {
         "Authorization": f"token {token}",
         "Accept": "application/vnd.github+json",
+        "Content-Type": "application/json",
     }
 
     data = {"title": title, "body": body, "head": head, "base": base}
 
-    async with httpx.AsyncClient() as client:
-        res = await client.post(
-            f"https://api.github.com/repos/{owner}/{repo}/pulls",
-            headers=headers,
-            json=data,
-        )
-        res.raise_for_status()
-        return res.json()
+    client = _client()
+    res = await client.post(
+        f"/repos/{owner}/{repo}/pulls",
+        headers=headers,
+        content=orjson.dumps(data),
+    )
+    res.raise_for_status()
+    return orjson.loads(res.content)
 
 
 async def get_file_metadata(token: str, owner: str, repo: str, path: str, branch: str):
@@ -457,24 +554,14 @@ async def get_file_metadata(token: str, owner: str, repo: str, path: str, branch
     }
 
     # Sanitize path and branch
-    if path is not None:
-        path = path.strip()
-        # Remove any non-printable ASCII characters, quotes, and backslashes
-        path = "".join(
-            char for char in path if char.isprintable() and char not in ('"', "'", "\\")
-        )
-    else:
-        path = ""
+    path = _sanitize(path)
 
     # URL encode the path and branch properly
-    encoded_path = urllib.parse.quote(path, safe="")
-    encoded_branch = urllib.parse.quote(branch, safe="")
+    encoded_path = _fastquote(path)
+    encoded_branch = _fastquote(branch)
 
-    url = f"https://api.github.com/repos/{owner}/{repo}/contents/{encoded_path}?ref={encoded_branch}"
-    async with httpx.AsyncClient() as client:
-        res = await client.get(url, headers=headers)
-        res.raise_for_status()
-        return res.json()
+    url = f"/repos/{owner}/{repo}/contents/{encoded_path}?ref={encoded_branch}"
+    return orjson.loads(await _get(url, headers))
 
 
 async def run_flow(change):
@@ -492,12 +579,12 @@ async def run_flow(change):
     # Get default branch and SHA
     default_branch, base_sha = await get_default_branch_sha(token, owner, repo_name)
 
-    # Create a new branch
+    # Create a new branch and, at the same time, read the file (content + SHA) at the commit it starts from
     new_branch = "automated-change-branch23-" + change
-    await create_branch(token, owner, repo_name, new_branch, base_sha)
-
-    # Get file metadata (content + SHA)
-    file_meta = await get_file_metadata(token, owner, repo_name, file_path, new_branch)
+    _, file_meta = await asyncio.gather(
+        create_branch(token, owner, repo_name, new_branch, base_sha),
+        get_file_metadata(token, owner, repo_name, file_path, base_sha),
+    )
     current_sha = file_meta["sha"]
     decoded_content = base64.b64decode(file_meta["content"]).decode()
 
@@ -535,6 +622,7 @@ async def get_all_file_paths(
     max_depth: int = None,
     branch: str = None,
     _current_depth: int = 0,
+    _semaphore: asyncio.Semaphore = None,
 ):
     """
     Recursively get all file paths in a GitHub repository.
@@ -547,6 +635,7 @@ async def get_all_file_paths(
         max_depth: Maximum directory depth to explore (default: None for unlimited)
         branch: The branch to get files from (default: None which uses the default branch)
         _current_depth: Internal parameter to track current recursion depth
+        _semaphore: Internal parameter limiting concurrent directory listings across the recursion
 
     Returns:
         List of file paths in the repository
@@ -554,17 +643,19 @@ async def get_all_file_paths(
     Example:
         files = await get_all_file_paths("ghs_abc123...", "octocat", "hello-world", max_depth=2, branch="main")
     """
-    all_files = []
-    items = await list_files_in_repo(token, owner, repo, path, branch=branch)
-
-    for item in items:
-        if item["type"] == "file":
-            all_files.append(item["path"])
-        elif item["type"] == "dir":
-            # Check if we've reached max depth before recursing
-            if max_depth is None or _current_depth < max_depth:
-                # Recursively get files in subdirectory with incremented depth
-                subdir_files = await get_all_file_paths(
+    # One semaphore for the whole walk, created by the top-level call
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(_LISTING_CONCURRENCY)
+
+    async with _semaphore:
+        items = await list_files_in_repo(token, owner, repo, path, branch=branch)
+
+    # List sibling subdirectories concurrently, checking max depth before recursing
+    recurse = max_depth is None or _current_depth < max_depth
+    subdir_listings = iter(
+        await asyncio.gather(
+            *(
+                get_all_file_paths(
                     token,
                     owner,
                     repo,
@@ -572,12 +663,77 @@ async def get_all_file_paths(
                     max_depth=max_depth,
                     branch=branch,
                     _current_depth=_current_depth + 1,
+                    _semaphore=_semaphore,
                 )
-                all_files.extend(subdir_files)
+                for item in items
+                if item["type"] == "dir" and recurse
+            )
+        )
+    )
+
+    # Keep the listing order: each directory's files appear where the directory did
+    all_files = []
+    for item in items:
+        if item["type"] == "file":
+            all_files.append(item["path"])
+        elif item["type"] == "dir" and recurse:
+            all_files.extend(next(subdir_listings))
 
     return all_files
 
 
+async def get_all_file_paths_fast(
+    token: str,
+    owner: str,
+    repo: str,
+    max_depth: int = None,
+    branch: str = None,
+):
+    """
+    Get all file paths in a GitHub repository from one recursive git trees request, instead of one
+    contents request per directory.
+
+    Falls back to the per-directory walk of get_all_file_paths if GitHub truncates the tree
+    (very large repositories).
+
+    Args:
+        token: GitHub access token
+        owner: Repository owner
+        repo: Repository name
+        max_depth: Maximum directory depth to include (default: None for unlimited), counted like get_all_file_paths
+        branch: The branch to get files from (default: None which uses the default branch)
+
+    Returns:
+        List of file paths in the repository
+
+    Example:
+        files = await get_all_file_paths_fast("ghs_abc123...", "octocat", "hello-world", max_depth=2, branch="main")
+    """
+    # Resolve the branch to a SHA first; the trees endpoint can't take branch names containing "/"
+    if branch:
+        _, tree_sha = await get_branch_head(token, owner, repo, branch)
+    else:
+        _, tree_sha = await get_default_branch_sha(token, owner, repo)
+
+    headers = {
+        "Authorization": f"token {token}",
+        "Accept": "application/vnd.github+json",
+    }
+    tree = orjson.loads(
+        await _get(f"/repos/{owner}/{repo}/git/trees/{tree_sha}", headers, params={"recursive": "1"})
+    )
+
+    if tree.get("truncated"):
+        return await get_all_file_paths(token, owner, repo, max_depth=max_depth, branch=branch)
+
+    return [
+        entry["path"]
+        for entry in tree["tree"]
+        if entry["type"] == "blob"
+        and (max_depth is None or entry["path"].count("/") <= max_depth)
+    ]
+
+
 def get_directory_structure(paths: list[str], include_full_paths: bool = True) -> str:
     """
     Given a list of file paths, return a string that represents the directory structure of the files.
@@ -595,83 +751,41 @@ def get_directory_structure(paths: list[str], include_full_paths: bool = True) -
     if not paths:
         return ""
 
-    # Build tree structure
-    tree = {}
-    path_mapping = {}  # Store the mapping between file names and their full paths
+    BRANCH, LAST, PIPE, SPACE = "├── ", "└── ", "│   ", "    "
 
+    # Build tree structure: each node holds its subdirectories by name and the names of its files
+    tree = {"_dirs": {}, "_files": []}
     for path in paths:
         parts = path.split("/")
-        current = tree
-        for i, part in enumerate(parts):
-            if i == len(parts) - 1:  # Last part (file)
-                if "_files" not in current:
-                    current["_files"] = []
-                current["_files"].append(part)
-                # Store the full path for this file
-                path_key = "/".join(parts[:i]) + "/" + part if i > 0 else part
-                path_mapping[path_key] = path
-            else:  # Directory
-                if part not in current:
-                    current[part] = {}
-                current = current[part]
+        node = tree
+        for part in parts[:-1]:
+            node = node["_dirs"].setdefault(part, {"_dirs": {}, "_files": []})
+        node["_files"].append(parts[-1])
 
     # Generate string representation
     result = []
 
-    def print_tree(node, prefix="", is_root=True, path_prefix=""):
-        # Print directories
-        dirs = sorted([k for k in node.keys() if k != "_files"])
-        files = sorted(node.get("_files", []))
-
-        for i, dir_name in enumerate(dirs):
-            is_last_dir = i == len(dirs) - 1 and not files
-            result.append(f"{prefix}{'└── ' if is_last_dir else '├── '}{dir_name}/")
-            new_prefix = f"{prefix}{'    ' if is_last_dir else '│   '}"
-            new_path_prefix = (
-                f"{path_prefix}{dir_name}/" if path_prefix else f"{dir_name}/"
-            )
-            print_tree(node[dir_name], new_prefix, False, new_path_prefix)
+    def print_tree(node, prefix, path_prefix):
+        dirs = sorted(node["_dirs"].items())
+        files = sorted(node["_files"])
 
-        # Print files
-        for i, file_name in enumerate(files):
-            is_last = i == len(files) - 1
-            file_path = f"{path_prefix}{file_name}" if path_prefix else file_name
+        # Print directories; the last one only gets the closing glyph if no files follow it
+        last_dir = len(dirs) - 1 if not files else -1
+        for i, (dir_name, child) in enumerate(dirs):
+            is_last_dir = i == last_dir
+            result.append(f"{prefix}{LAST if is_last_dir else BRANCH}{dir_name}/")
+            print_tree(child, prefix + (SPACE if is_last_dir else PIPE), f"{path_prefix}{dir_name}/")
 
-            # Add full path in parentheses if requested
-            if include_full_paths and file_path in path_mapping:
-                result.append(
-                    f"{prefix}{'└── ' if is_last else '├── '}{file_name} (path: {path_mapping[file_path]})"
-                )
+        # Print files, adding the full path in parentheses if requested
+        last_file = len(files) - 1
+        for i, file_name in enumerate(files):
+            connector = LAST if i == last_file else BRANCH
+            if include_full_paths:
+                result.append(f"{prefix}{connector}{file_name} (path: {path_prefix}{file_name})")
             else:
-                result.append(f"{prefix}{'└── ' if is_last else '├── '}{file_name}")
+                result.append(f"{prefix}{connector}{file_name}")
 
-    # Handle root level files first
-    root_files = []
-    root_dirs = {}
-
-    for k, v in tree.items():
-        if k == "_files":
-            root_files = sorted(v)
-        else:
-            root_dirs[k] = v
-
-    # Print the structure for root directories
-    for i, dir_name in enumerate(sorted(root_dirs.keys())):
-        is_last_dir = i == len(root_dirs) - 1 and not root_files
-        result.append(f"{'└── ' if is_last_dir else '├── '}{dir_name}/")
-        new_prefix = f"{'    ' if is_last_dir else '│   '}"
-        print_tree(root_dirs[dir_name], new_prefix, False, f"{dir_name}/")
-
-    # Print root level files
-    for i, file_name in enumerate(root_files):
-        is_last = i == len(root_files) - 1
-        # Add full path in parentheses if requested
-        if include_full_paths and file_name in path_mapping:
-            result.append(
-                f"{'└── ' if is_last else '├── '}{file_name} (path: {path_mapping[file_name]})"
-            )
-        else:
-            result.append(f"{'└── ' if is_last else '├── '}{file_name}")
+    print_tree(tree, "", "")
 
     return "\n".join(result)
 
@@ -693,19 +807,11 @@ async def get_gitignore_patterns(token: str, owner: str, repo: str):
     Example:
         patterns = await get_gitignore_patterns("ghs_abc123...", "octocat", "hello-world")
     """
-    all_patterns = []
-
     # Try to get the root .gitignore file
     try:
-        root_content = await read_file_from_repo(token, owner, repo, ".gitignore")
-
-        # Process root .gitignore content line by line
-        for line in root_content.splitlines():
-            line = line.strip()
-            if not line or line.startswith("#"):
-                continue
-            all_patterns.append(line)
-
+        root_content = await read_file_from_repo(
+            token, owner, repo, ".gitignore", add_line_numbers=False
+        )
     except httpx.HTTPStatusError as e:
         # Root .gitignore not found, return empty list
         if e.response.status_code == 404:
@@ -713,10 +819,11 @@ async def get_gitignore_patterns(token: str, owner: str, repo: str):
         else:
             raise  # Re-raise if it's not a 404 error
 
-    return all_patterns
+    # Keep every non-blank, non-comment line
+    return [line for line in map(str.strip, root_content.splitlines()) if line and line[0] != "#"]
 
 
-async def apply_file_edits(current_content: str, edits: list) -> str:
+def apply_file_edits(current_content: str, edits: list) -> str:
     """
     Apply a list of edit operations to file content.
 
@@ -728,55 +835,60 @@ async def apply_file_edits(current_content: str, edits: list) -> str:
             - end_line: The line where the edit ends for replacements and deletions (1-indexed)
             - content: The new content for replacements and insertions
 
+    Several insertions at the same line_number are stacked in reverse of the order given: each one is
+    placed directly above the line, on top of the previous ones.
+
     Returns:
         The modified content as a string
+
+    Raises:
+        ValueError: If two edits touch the same lines
     """
     lines = current_content.splitlines()
+    total_lines = len(lines)
 
-    # Sort edits in reverse order of line number so we can apply them without
-    # affecting the line numbers of other edits
-    sorted_edits = sorted(
-        edits, key=lambda e: e.get("start_line", e.get("line_number", 0)), reverse=True
-    )
-
-    for edit in sorted_edits:
+    # Normalize every edit once into (start, end, tiebreak, new lines): 0-indexed, end exclusive, within bounds
+    normalized = []
+    for index, edit in enumerate(edits):
         edit_type = edit.get("type")
 
-        if edit_type == "replacement":
+        if edit_type in ("replacement", "deletion"):
             start_line = edit.get("start_line", 1) - 1  # Convert to 0-indexed
             end_line = edit.get("end_line", start_line + 1) - 1  # Convert to 0-indexed
-            new_content = edit.get("content", "").splitlines()
 
             # Ensure start and end are within bounds
-            start_line = max(0, min(start_line, len(lines)))
-            end_line = max(start_line, min(end_line, len(lines) - 1))
+            start_line = max(0, min(start_line, total_lines))
+            end_line = max(start_line, min(end_line, total_lines - 1))
 
-            # Replace the lines
-            lines[start_line : end_line + 1] = new_content
+            new_content = edit.get("content", "").splitlines() if edit_type == "replacement" else []
+            normalized.append((start_line, min(end_line + 1, total_lines), index, new_content))
 
         elif edit_type == "insertion":
-            line_number = edit.get("line_number", 1) - 1  # Convert to 0-indexed
-            new_content = edit.get("content", "").splitlines()
-
             # Ensure line number is within bounds or at the end
-            line_number = max(0, min(line_number, len(lines)))
+            line_number = max(0, min(edit.get("line_number", 1) - 1, total_lines))  # Convert to 0-indexed
+            # Insertions at the same line each go above the earlier ones, so they end up last-listed first
+            normalized.append((line_number, line_number, -index, edit.get("content", "").splitlines()))
 
-            # Insert the new content
-            lines[line_number:line_number] = new_content
+    # Sort by position so the file can be rebuilt in a single forward pass; an insertion (empty
+    # range) goes before a replacement or deletion that starts on the same line
+    normalized.sort(key=operator.itemgetter(0, 1, 2))
 
-        elif edit_type == "deletion":
-            start_line = edit.get("start_line", 1) - 1  # Convert to 0-indexed
-            end_line = edit.get("end_line", start_line + 1) - 1  # Convert to 0-indexed
+    # Copy untouched lines up to each edit, then its new content, then skip the lines it covers
+    result_lines = []
+    cursor = 0  # First original line (0-indexed) not yet copied or replaced
 
-            # Ensure start and end are within bounds
-            start_line = max(0, min(start_line, len(lines)))
-            end_line = max(start_line, min(end_line, len(lines) - 1))
+    for start, end, _, new_content in normalized:
+        if start < cursor:
+            raise ValueError(f"Edit starting at line {start + 1} overlaps a previous edit")
 
-            # Delete the lines
-            del lines[start_line : end_line + 1]
+        result_lines.extend(lines[cursor:start])
+        result_lines.extend(new_content)
+        cursor = end
+
+    result_lines.extend(lines[cursor:])
 
     # Rejoin the lines with the original line ending
-    return "\n".join(lines)
+    return "\n".join(result_lines)
 
 
 async def check_file_exists(
@@ -795,17 +907,23 @@ async def check_file_exists(
     Returns:
         True if the file exists, False otherwise
     """
-    try:
-        await get_file_metadata(token, owner, repo, path, branch)
-        return True
-    except httpx.HTTPStatusError as e:
-        if e.response.status_code == 404:
-            return False
-        raise
+    headers = {
+        "Authorization": f"token {token}",
+        "Accept": "application/vnd.github+json",
+    }
+
+    # A HEAD request, so the file's content is never downloaded
+    url = f"/repos/{owner}/{repo}/contents/{_fastquote(_sanitize(path))}?ref={_fastquote(branch)}"
+    client = _client()
+    res = await client.head(url, headers=headers)
+    if res.status_code == 404:
+        return False
+    res.raise_for_status()
+    return True
 
 
 async def create_file(
-    token: str, owner: str, repo: str, branch: str, path: str, content: str
+    token: str, owner: str, repo: str, branch: str, path: str, content: str | bytes
 ) -> dict:
     """
     Create a new file in the repository.
@@ -816,7 +934,7 @@ async def create_file(
         repo: Repository name
         branch: Branch to create the file in
         path: Path to the new file
-        content: Content of the new file
+        content: Content of the new file, as text or raw bytes
 
     Returns:
         Response from the GitHub API
@@ -824,22 +942,18 @@ async def create_file(
     headers = {
         "Authorization": f"token {token}",
         "Accept": "application/vnd.github+json",
+        "Content-Type": "application/json",
     }
 
     # Sanitize path
-    if path is not None:
-        path = path.strip()
-        path = "".join(
-            char for char in path if char.isprintable() and char not in ('"', "'", "\\")
-        )
-    else:
-        path = ""
+    path = _sanitize(path)
 
     # URL encode the path
-    encoded_path = urllib.parse.quote(path, safe="")
+    encoded_path = _fastquote(path)
 
-    # Encode content as base64
-    content_encoded = base64.b64encode(content.encode()).decode()
+    # Encode content as base64 (bytes are sent as-is)
+    raw = content if isinstance(content, (bytes, bytearray)) else content.encode()
+    content_encoded = base64.b64encode(raw).decode("ascii")
 
     data = {
         "message": "Create file via GitHub App",
@@ -847,14 +961,324 @@ async def create_file(
         "branch": branch,
     }
 
-    async with httpx.AsyncClient() as client:
-        res = await client.put(
-            f"https://api.github.com/repos/{owner}/{repo}/contents/{encoded_path}",
-            headers=headers,
-            json=data,
+    client = _client()
+    res = await client.put(
+        f"/repos/{owner}/{repo}/contents/{encoded_path}",
+        headers=headers,
+        content=orjson.dumps(data),
+    )
+    res.raise_for_status()
+    return orjson.loads(res.content)
+
+
+async def delete_file(
+    token: str, owner: str, repo: str, branch: str, path: str, file_sha: str
+) -> dict:
+    """
+    Delete a file from the repository.
+
+    Args:
+        token: GitHub access token
+        owner: Repository owner
+        repo: Repository name
+        branch: Branch to delete the file from
+        path: Path to the file
+        file_sha: SHA of the file's current blob
+
+    Returns:
+        Response from the GitHub API
+    """
+    headers = {
+        "Authorization": f"token {token}",
+        "Accept": "application/vnd.github+json",
+        "Content-Type": "application/json",
+    }
+
+    # Sanitize path
+    path = _sanitize(path)
+
+    # URL encode the path
+    encoded_path = _fastquote(path)
+
+    data = {
+        "message": f"Delete {path}",
+        "sha": file_sha,
+        "branch": branch,
+    }
+
+    client = _client()
+    res = await client.request(
+        "DELETE",
+        f"/repos/{owner}/{repo}/contents/{encoded_path}",
+        headers=headers,
+        content=orjson.dumps(data),
+    )
+    res.raise_for_status()
+    return orjson.loads(res.content)
+
+
+async def get_branch_head(token: str, owner: str, repo: str, branch: str):
+    """
+    Get the latest commit SHA of a branch and the SHA of that commit's tree.
+
+    Example:
+        commit_sha, tree_sha = await get_branch_head("ghs_abc123...", "octocat", "hello-world", "main")
+    """
+    headers = {
+        "Authorization": f"token {token}",
+        "Accept": "application/vnd.github+json",
+    }
+    commit = orjson.loads(await _get(f"/repos/{owner}/{repo}/branches/{branch}", headers))["commit"]
+    return commit["sha"], commit["commit"]["tree"]["sha"]
+
+
+async def create_blob(token: str, owner: str, repo: str, content: str) -> str:
+    """
+    Store file content as a git blob and return its SHA.
+
+    Example:
+        blob_sha = await create_blob("ghs_abc123...", "octocat", "hello-world", "# Updated content")
+    """
+    headers = {
+        "Authorization": f"token {token}",
+        "Accept": "application/vnd.github+json",
+        "Content-Type": "application/json",
+    }
+    data = {"content": content, "encoding": "utf-8"}
+    client = _client()
+    res = await client.post(
+        f"/repos/{owner}/{repo}/git/blobs",
+        headers=headers,
+        content=orjson.dumps(data),
+    )
+    res.raise_for_status()
+    return orjson.loads(res.content)["sha"]
+
+
+async def create_tree(
+    token: str, owner: str, repo: str, base_tree_sha: str, entries: list
+) -> str:
+    """
+    Create a git tree from a base tree and a list of changed entries, and return its SHA.
+
+    An entry with "sha": None removes that path from the tree.
+
+    Example:
+        tree_sha = await create_tree(
+            "ghs_abc123...",
+            "octocat",
+            "hello-world",
+            "a1b2c3d4...",
+            [{"path": "README.md", "mode": "100644", "type": "blob", "sha": "e5f6a7b8..."}]
+        )
+    """
+    headers = {
+        "Authorization": f"token {token}",
+        "Accept": "application/vnd.github+json",
+        "Content-Type": "application/json",
+    }
+    data = {"base_tree": base_tree_sha, "tree": entries}
+    client = _client()
+    res = await client.post(
+        f"/repos/{owner}/{repo}/git/trees",
+        headers=headers,
+        content=orjson.dumps(data),
+    )
+    res.raise_for_status()
+    return orjson.loads(res.content)["sha"]
+
+
+async def create_commit(
+    token: str, owner: str, repo: str, message: str, tree_sha: str, parent_sha: str
+) -> dict:
+    """
+    Create a commit pointing at a tree, with a single parent.
+
+    Example:
+        commit = await create_commit("ghs_abc123...", "octocat", "hello-world", "Update files", "a1b2c3d4...", "e5f6a7b8...")
+    """
+    headers = {
+        "Authorization": f"token {token}",
+        "Accept": "application/vnd.github+json",
+        "Content-Type": "application/json",
+    }
+    data = {"message": message, "tree": tree_sha, "parents": [parent_sha]}
+    client = _client()
+    res = await client.post(
+        f"/repos/{owner}/{repo}/git/commits",
+        headers=headers,
+        content=orjson.dumps(data),
+    )
+    res.raise_for_status()
+    return orjson.loads(res.content)
+
+
+async def update_ref(token: str, owner: str, repo: str, branch: str, commit_sha: str) -> dict:
+    """
+    Move a branch to a new commit. Only fast-forward updates are allowed.
+
+    Example:
+        ref = await update_ref("ghs_abc123...", "octocat", "hello-world", "feature-branch", "a1b2c3d4...")
+    """
+    headers = {
+        "Authorization": f"token {token}",
+        "Accept": "application/vnd.github+json",
+        "Content-Type": "application/json",
+    }
+    data = {"sha": commit_sha, "force": False}
+    client = _client()
+    res = await client.patch(
+        f"/repos/{owner}/{repo}/git/refs/heads/{branch}",
+        headers=headers,
+        content=orjson.dumps(data),
+    )
+    res.raise_for_status()
+    return orjson.loads(res.content)
+
+
+async def get_tree_entries(token: str, owner: str, repo: str, commit_sha: str, paths: list) -> dict:
+    """
+    Look up the git file mode (e.g. "100644" or "100755") and blob SHA of the given paths at a commit.
+
+    Only the parent directory of each path is listed, one non-recursive tree request per directory,
+    so the cost doesn't grow with the size of the repository. Paths that don't exist are left out.
+
+    Returns:
+        Dict mapping each existing path to its {"mode": ..., "sha": ...}
+
+    Raises:
+        ValueError: If a directory listing is truncated and doesn't include a path, so its entry is unknown
+
+    Example:
+        entries = await get_tree_entries("ghs_abc123...", "octocat", "hello-world", "a1b2c3d4...", ["bin/run.sh"])
+    """
+    headers = {
+        "Authorization": f"token {token}",
+        "Accept": "application/vnd.github+json",
+    }
+
+    # parent directory -> file names wanted from it
+    names_by_dir = {}
+    for path in paths:
+        directory, _, name = path.rpartition("/")
+        names_by_dir.setdefault(directory, []).append(name)
+
+    async def list_directory(directory: str) -> dict:
+        # A commit SHA names its root tree, and "<commit>:<dir>" the tree of a directory in it
+        tree_ish = urllib.parse.quote(f"{commit_sha}:{directory}", safe="/:") if directory else commit_sha
+        try:
+            return orjson.loads(await _get(f"/repos/{owner}/{repo}/git/trees/{tree_ish}", headers))
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code != 404:
+                raise
+            return {"tree": []}  # The directory doesn't exist yet
+
+    listings = await asyncio.gather(*(list_directory(directory) for directory in names_by_dir))
+
+    entries = {}
+    for (directory, names), listing in zip(names_by_dir.items(), listings):
+        dir_entries = {entry["path"]: entry for entry in listing.get("tree", []) if entry["type"] == "blob"}
+        for name in names:
+            path = f"{directory}/{name}" if directory else name
+            if name in dir_entries:
+                entries[path] = {"mode": dir_entries[name]["mode"], "sha": dir_entries[name]["sha"]}
+            elif listing.get("truncated"):
+                raise ValueError(f"Cannot look up {path}: the listing of its directory is truncated")
+    return entries
+
+
+async def commit_files(
+    token: str, owner: str, repo: str, branch: str, files: dict, message: str = None
+) -> dict:
+    """
+    Write several files to a branch in a single commit using the Git Data API.
+
+    All blobs are uploaded concurrently, then one tree, one commit and one ref update are made,
+    instead of one contents API request (and one commit) per file. If the branch moves in the
+    meantime (e.g. a concurrent push) without touching these files, the tree and commit are rebuilt
+    on its new head once; if the push changed any of them, the commit is refused rather than
+    overwriting that change.
+
+    Args:
+        token: GitHub access token
+        owner: Repository owner
+        repo: Repository name
+        branch: Branch to commit to
+        files: Dict mapping file paths to their new content, or None to delete the file
+        message: Commit message (default: a summary of the number of files changed)
+
+    Returns:
+        The created commit from the GitHub API
+
+    Raises:
+        ValueError: If the branch moved and one of the files changed on it in the meantime
+
+    Example:
+        commit = await commit_files(
+            "ghs_abc123...",
+            "octocat",
+            "hello-world",
+            "feature-branch",
+            {"README.md": "# Updated content", "old.txt": None}
+        )
+    """
+    files = {_sanitize(path): content for path, content in files.items()}
+    if message is None:
+        message = (
+            "Update file via GitHub App"
+            if len(files) == 1
+            else f"Update {len(files)} files via GitHub App"
         )
-        res.raise_for_status()
-        return res.json()
+
+    written_paths = [path for path, content in files.items() if content is not None]
+
+    async def read_head():
+        # The branch head, and the existing entries of the files: modes (e.g. executables) are kept,
+        # blob SHAs show whether a file changed if the branch moves before the ref update
+        parent_sha, base_tree_sha = await get_branch_head(token, owner, repo, branch)
+        entries = await get_tree_entries(token, owner, repo, parent_sha, list(files))
+        return parent_sha, base_tree_sha, entries
+
+    # Upload the new contents while the head is read
+    blob_shas, head = await asyncio.gather(
+        asyncio.gather(*(create_blob(token, owner, repo, files[path]) for path in written_paths)),
+        read_head(),
+    )
+
+    for attempt in range(2):
+        if attempt:
+            previous_entries = head[2]
+            head = await read_head()
+            changed = [path for path in files if previous_entries.get(path) != head[2].get(path)]
+            if changed:
+                raise ValueError(f"{branch} moved and these files changed on it meanwhile: {', '.join(changed)}")
+        parent_sha, base_tree_sha, existing = head
+
+        entries = [
+            {
+                "path": path,
+                "mode": existing[path]["mode"] if path in existing else "100644",
+                "type": "blob",
+                "sha": blob_sha,
+            }
+            for path, blob_sha in zip(written_paths, blob_shas)
+        ]
+        entries.extend(
+            {"path": path, "mode": "100644", "type": "blob", "sha": None}
+            for path, content in files.items()
+            if content is None
+        )
+
+        tree_sha = await create_tree(token, owner, repo, base_tree_sha, entries)
+        commit = await create_commit(token, owner, repo, message, tree_sha, parent_sha)
+        try:
+            await update_ref(token, owner, repo, branch, commit["sha"])
+        except httpx.HTTPStatusError as e:
+            # 422: not a fast-forward, the branch moved after its head was read; retry on the new head once
+            if e.response.status_code != 422 or attempt:
+                raise
+            continue
+        return commit
 
 
 async def batch_update_files(
@@ -932,8 +1356,13 @@ async def batch_update_files(
             }
             ```
             - Only works on existing files
-            - Line numbers are 1-indexed
-            - Edits are applied in the order specified
+            - Line numbers are 1-indexed and refer to the original file, before any edit is applied
+            - Edits are applied by line position, not in the order listed; an insertion goes above a
+              replacement or deletion starting on the same line, and several insertions at the same
+              line end up in reverse of the order listed
+            - Edits must not overlap: if two edits touch the same lines, none of the file's edits are
+              applied and its diff_results entry has status False, operation "failed" and the error
+              (the other files are still written)
 
             4. **File Deletion:**
             ```python
@@ -950,7 +1379,7 @@ async def batch_update_files(
         dict: Comprehensive results dictionary containing:
         ```python
         {
-            "results": [list],              # Raw GitHub API responses for each file operation
+            "results": [list],              # One {"path", "deleted", "commit"} entry per file written, "commit" being the GitHub API response for the single commit
             "modified_files_count": int,    # Number of files actually modified
             "modified_files_content": {     # Final content of each file after changes
                 "path/to/file1.py": "content...",
@@ -1012,7 +1441,9 @@ async def batch_update_files(
         ```
 
     Notes:
-        - Operations are applied in the order they appear in the dictionary
+        - Operations are applied in the order they appear in the dictionary, and every file that
+          changes is written in a single commit at the end (nothing is committed if any file fails);
+          a single changed file is written with one contents API request instead
         - For unified diffs, the function uses fuzzy matching to handle minor differences
         - File paths should be relative to the repository root
         - All operations are committed to the specified branch
@@ -1020,51 +1451,33 @@ async def batch_update_files(
         - For safety, always check the `diff_results` for any failed operations
         - Escape sequences (\\n, \\t, etc.) are automatically decoded in 'new_content' but NOT in 'unified_diffs'
     """
-    results = []
+    # path -> new content (None to delete), all written at the end in a single commit
+    writes = {}
+    # path -> blob SHA of the files that already exist
+    file_shas = {}
     modified_files_content = {}
     diff_results = {}
 
     for file_path, changes in path_to_changes.items():
-        # Check if file exists and get original content if it does
-        file_exists = await check_file_exists(token, owner, repo, file_path, branch)
+        # Get the original content if the file exists; a missing file is a 404
+        file_exists = True
         original_content = ""
-
-        if file_exists:
+        try:
             file_meta = await get_file_metadata(token, owner, repo, file_path, branch)
             original_content = base64.b64decode(file_meta["content"]).decode()
+            file_shas[file_path] = file_meta["sha"]
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code != 404:
+                raise
+            file_exists = False
 
         # Handle file deletion
         if changes.get("delete_file", False):
             if file_exists:
-                file_sha = file_meta["sha"]
-
-                # Delete file by creating a commit that removes the file
-                headers = {
-                    "Authorization": f"token {token}",
-                    "Accept": "application/vnd.github+json",
-                }
-
-                data = {
-                    "message": f"Delete {file_path}",
-                    "sha": file_sha,
-                    "branch": branch,
-                }
-
-                encoded_path = urllib.parse.quote(file_path, safe="")
-
-                async with httpx.AsyncClient() as client:
-                    res = await client.delete(
-                        f"https://api.github.com/repos/{owner}/{repo}/contents/{encoded_path}",
-                        headers=headers,
-                        content=json.dumps(data),
-                    )
-                    res.raise_for_status()
-                    result = res.json()
-                    results.append(result)
-                    modified_files_content[file_path] = (
-                        None  # Indicate file was deleted
-                    )
-                    diff_results[file_path] = {"status": True, "operation": "delete"}
+                # Remove the file in the commit
+                writes[file_path] = None
+                modified_files_content[file_path] = None  # Indicate file was deleted
+                diff_results[file_path] = {"status": True, "operation": "delete"}
             else:
                 # Cannot delete a non-existent file, but we'll consider it a success
                 modified_files_content[file_path] = None
@@ -1081,21 +1494,13 @@ async def batch_update_files(
             # This allows LLMs to specify newlines and other characters using escape sequences
             new_content = decode_escape_sequences(new_content)
 
-            if file_exists:
-                # Update existing file
-                file_sha = file_meta["sha"]
-                result = await update_file(
-                    token, owner, repo, branch, file_path, new_content, file_sha
-                )
-                diff_results[file_path] = {"status": True, "operation": "update"}
-            else:
-                # Create new file
-                result = await create_file(
-                    token, owner, repo, branch, file_path, new_content
-                )
-                diff_results[file_path] = {"status": True, "operation": "create"}
+            # Update the existing file or create a new one
+            writes[file_path] = new_content
+            diff_results[file_path] = {
+                "status": True,
+                "operation": "update" if file_exists else "create",
+            }
 
-            results.append(result)
             # Store the limited content
             limited_content = limit_file_content_around_changes(
                 original_content, new_content
@@ -1126,39 +1531,16 @@ async def batch_update_files(
             if diff_application_result["is_deleted_file"]:
                 # Delete file
                 if file_exists:
-                    file_sha = file_meta["sha"]
-                    headers = {
-                        "Authorization": f"token {token}",
-                        "Accept": "application/vnd.github+json",
-                    }
-                    data = {
-                        "message": f"Delete {file_path}",
-                        "sha": file_sha,
-                        "branch": branch,
-                    }
-                    encoded_path = urllib.parse.quote(file_path, safe="")
-                    async with httpx.AsyncClient() as client:
-                        res = await client.delete(
-                            f"https://api.github.com/repos/{owner}/{repo}/contents/{encoded_path}",
-                            headers=headers,
-                            content=json.dumps(data),
-                        )
-                        res.raise_for_status()
-                        result = res.json()
-                        results.append(result)
-                        modified_files_content[file_path] = None
-                        diff_results[file_path]["operation"] = "delete"
+                    writes[file_path] = None
+                    modified_files_content[file_path] = None
+                    diff_results[file_path]["operation"] = "delete"
             elif not new_content.strip():
                 # Content is empty but not marked for deletion - do nothing
                 diff_results[file_path]["operation"] = "no_change"
                 continue
             elif file_exists and not diff_application_result["is_new_file"]:
                 # Update existing file
-                file_sha = file_meta["sha"]
-                result = await update_file(
-                    token, owner, repo, branch, file_path, new_content, file_sha
-                )
-                results.append(result)
+                writes[file_path] = new_content
                 # Store the limited content
                 limited_content = limit_file_content_around_changes(
                     original_content, new_content
@@ -1167,10 +1549,7 @@ async def batch_update_files(
                 diff_results[file_path]["operation"] = "update"
             else:
                 # Create new file
-                result = await create_file(
-                    token, owner, repo, branch, file_path, new_content
-                )
-                results.append(result)
+                writes[file_path] = new_content
                 # Store the limited content (original_content is empty for new files)
                 limited_content = limit_file_content_around_changes("", new_content)
                 modified_files_content[file_path] = limited_content
@@ -1178,17 +1557,21 @@ async def batch_update_files(
 
         elif "edits" in changes and file_exists:
             # Apply edits to existing file
-            file_sha = file_meta["sha"]
             current_content = original_content  # We already have it
 
-            # Apply all edits to get the new content
-            new_content = await apply_file_edits(current_content, changes["edits"])
+            # Apply all edits to get the new content; overlapping edits fail this file only
+            try:
+                new_content = apply_file_edits(current_content, changes["edits"])
+            except ValueError as e:
+                diff_results[file_path] = {
+                    "status": False,
+                    "error": str(e),
+                    "operation": "failed",
+                }
+                continue
 
             # Update the file with the edited content
-            result = await update_file(
-                token, owner, repo, branch, file_path, new_content, file_sha
-            )
-            results.append(result)
+            writes[file_path] = new_content
             # Store the limited content
             limited_content = limit_file_content_around_changes(
                 original_content, new_content
@@ -1206,6 +1589,24 @@ async def batch_update_files(
             }
             raise ValueError(error_message)
 
+    results = []
+    if len(writes) == 1:
+        # A single file is one contents API request, no Git Data API round trips needed
+        [(path, content)] = writes.items()
+        if content is None:
+            result = await delete_file(token, owner, repo, branch, path, file_shas[path])
+        elif path in file_shas:
+            result = await update_file(token, owner, repo, branch, path, content, file_shas[path])
+        else:
+            result = await create_file(token, owner, repo, branch, path, content)
+        results = [{"path": path, "deleted": content is None, "commit": result["commit"]}]
+    elif writes:
+        commit = await commit_files(token, owner, repo, branch, writes)
+        results = [
+            {"path": path, "deleted": content is None, "commit": commit}
+            for path, content in writes.items()
+        ]
+
     return {
         "results": results,
         "modified_files_count": len(results),
@@ -1281,6 +1682,8 @@ async def fetch_changes_from_name(
     }
 
     # Parse the date string to datetime object
+    from dateutil import parser
+
     try:
         since_date = parser.parse(date_string)
         # Convert to ISO 8601 format as required by GitHub API
@@ -1294,68 +1697,68 @@ async def fetch_changes_from_name(
     default_branch, _ = await get_default_branch_sha(token, owner, repo)
 
     # Fetch commits since the specified date
-    async with httpx.AsyncClient() as client:
-        # Build URL with query parameters
-        url = f"https://api.github.com/repos/{owner}/{repo}/commits"
-        params = {"since": since_iso, "sha": default_branch}
+    client = _client()
+    # Build URL with query parameters
+    url = f"/repos/{owner}/{repo}/commits"
+    params = {"since": since_iso, "sha": default_branch}
 
-        res = await client.get(url, headers=headers, params=params)
-        res.raise_for_status()
-        commits = res.json()
+    res = await client.get(url, headers=headers, params=params)
+    res.raise_for_status()
+    commits = orjson.loads(res.content)
 
-        # If no commits found since the date
-        if not commits:
-            return {}
+    # If no commits found since the date
+    if not commits:
+        return {}
 
-        # Track changes for each file
-        file_changes = {}
+    # Track changes for each file
+    file_changes = {}
 
-        # Process each commit to extract file changes
-        for commit in commits:
-            commit_sha = commit["sha"]
+    # Process each commit to extract file changes
+    for commit in commits:
+        commit_sha = commit["sha"]
 
-            # Get detailed commit info including files changed
-            commit_detail_url = (
-                f"https://api.github.com/repos/{owner}/{repo}/commits/{commit_sha}"
-            )
-            commit_res = await client.get(commit_detail_url, headers=headers)
-            commit_res.raise_for_status()
-            commit_detail = commit_res.json()
-
-            # Process each file in the commit
-            for file_info in commit_detail.get("files", []):
-                file_path = file_info["filename"]
-                status = file_info["status"]  # added, modified, removed, renamed
-
-                # Initialize file entry if not exists
-                if file_path not in file_changes:
-                    file_changes[file_path] = {
-                        "deleted": False,
-                        "new": False,
-                        "modified": False,
-                    }
+        # Get detailed commit info including files changed
+        commit_detail_url = (
+            f"/repos/{owner}/{repo}/commits/{commit_sha}"
+        )
+        commit_res = await client.get(commit_detail_url, headers=headers)
+        commit_res.raise_for_status()
+        commit_detail = orjson.loads(commit_res.content)
+
+        # Process each file in the commit
+        for file_info in commit_detail.get("files", []):
+            file_path = file_info["filename"]
+            status = file_info["status"]  # added, modified, removed, renamed
+
+            # Initialize file entry if not exists
+            if file_path not in file_changes:
+                file_changes[file_path] = {
+                    "deleted": False,
+                    "new": False,
+                    "modified": False,
+                }
+
+            # Update file status based on changes
+            if status == "added":
+                file_changes[file_path]["new"] = True
+            elif status == "removed":
+                file_changes[file_path]["deleted"] = True
+            elif status == "modified":
+                file_changes[file_path]["modified"] = True
+            elif status == "renamed":
+                # For renamed files, mark the old path as deleted and new path as new
+                old_file_path = file_info.get("previous_filename")
+                if old_file_path:
+                    if old_file_path not in file_changes:
+                        file_changes[old_file_path] = {
+                            "deleted": True,
+                            "new": False,
+                            "modified": False,
+                        }
+                    else:
+                        file_changes[old_file_path]["deleted"] = True
 
-                # Update file status based on changes
-                if status == "added":
                     file_changes[file_path]["new"] = True
-                elif status == "removed":
-                    file_changes[file_path]["deleted"] = True
-                elif status == "modified":
-                    file_changes[file_path]["modified"] = True
-                elif status == "renamed":
-                    # For renamed files, mark the old path as deleted and new path as new
-                    old_file_path = file_info.get("previous_filename")
-                    if old_file_path:
-                        if old_file_path not in file_changes:
-                            file_changes[old_file_path] = {
-                                "deleted": True,
-                                "new": False,
-                                "modified": False,
-                            }
-                        else:
-                            file_changes[old_file_path]["deleted"] = True
-
-                        file_changes[file_path]["new"] = True
 
     return file_changes
 
@@ -1400,8 +1803,8 @@ async def apply_unified_diffs(current_content: str, unified_diffs: list[str]) ->
         - status: Success status of the operation
         - failed_hunks: List of hunks that failed to apply cleanly
     """
-    # Initialize diff-match-patch
-    dmp = diff_match_patch()
+    # Shared diff-match-patch instance (it holds only matching settings, no per-diff state)
+    dmp = _get_dmp()
 
     # Split content into lines for line number calculations
     content_lines = current_content.splitlines()
@@ -1573,25 +1976,31 @@ async def search_files_by_name(
         # Returns: [{"path": "src/utils.py", "filename": "utils.py", "score": 85}, ...]
     """
     # Get all file paths in the repository
-    all_file_paths = await get_all_file_paths(token, owner, repo, branch=branch)
+    all_file_paths = await get_all_file_paths_fast(token, owner, repo, branch=branch)
+
+    from rapidfuzz import fuzz, utils
 
     # Extract just the filename from each path and calculate fuzzy match scores
     matches = []
+    query_lower = query.lower()
 
     for file_path in all_file_paths:
         # Get just the filename (last part of the path)
         filename = file_path.split("/")[-1]
 
-        # Calculate fuzzy match scores using different algorithms
-        ratio_score = fuzz.ratio(query.lower(), filename.lower())
-        partial_ratio_score = fuzz.partial_ratio(query.lower(), filename.lower())
-        token_sort_score = fuzz.token_sort_ratio(query.lower(), filename.lower())
-        token_set_score = fuzz.token_set_ratio(query.lower(), filename.lower())
+        filename_lower = filename.lower()
 
-        # Use the highest score from all algorithms
-        best_score = max(
+        # Calculate fuzzy match scores using different algorithms
+        # (the token scorers use the same default preprocessing fuzzywuzzy applied)
+        ratio_score = fuzz.ratio(query_lower, filename_lower)
+        partial_ratio_score = fuzz.partial_ratio(query_lower, filename_lower)
+        token_sort_score = fuzz.token_sort_ratio(query_lower, filename_lower, processor=utils.default_process)
+        token_set_score = fuzz.token_set_ratio(query_lower, filename_lower, processor=utils.default_process)
+
+        # Use the highest score from all algorithms, as a whole number like before
+        best_score = round(max(
             ratio_score, partial_ratio_score, token_sort_score, token_set_score
-        )
+        ))
 
         # Only include matches above the threshold
         if best_score >= threshold:
@@ -1643,7 +2052,7 @@ async def search_repo_code(
           - has_next: whether there are more pages
           - has_prev: whether there are previous pages
     """
-    base_url = "https://api.github.com/search/code"
+    base_url = "/search/code"
     headers = {
         "Accept": "application/vnd.github+json",
         "Authorization": f"Bearer {installation_token}",
@@ -1661,11 +2070,12 @@ async def search_repo_code(
     page = 1
 
     # First, get all matching files from GitHub's code search
+    client = _client()
     while True:
         params = {"q": q, "per_page": per_page, "page": page}
-        resp = requests.get(base_url, headers=headers, params=params)
+        resp = await client.get(base_url, headers=headers, params=params)
         resp.raise_for_status()
-        data = resp.json()
+        data = orjson.loads(resp.content)
 
         items = data.get("items", [])
         file_results.extend(items)
@@ -1814,6 +2224,7 @@ def limit_file_content_around_changes(
         return new_content
 
     # Find changed line ranges by comparing original and new content
+    import difflib
 
     diff = list(
         difflib.unified_diff(
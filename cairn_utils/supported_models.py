@@ -5,6 +5,7 @@ This file maps model providers to the classes that support them, and to the mode
 
 
 from agents.llm_consts import (
+    ChatLLM,
     ChatAnthropic,
     AnthropicResponse,
     ChatOpenAI,
@@ -12,6 +13,7 @@ from agents.llm_consts import (
     ChatGemini,
 )
 from difflib import SequenceMatcher
+import functools
 
 
 SUPPORTED_MODELS = {
@@ -102,5 +104,32 @@ def find_supported_model_given_model_name(model_name: str, allow_fuzzy_match: bo
     return None, None
 
 
+@functools.lru_cache(maxsize=32)
+def get_chat_client(provider: str, model_name: str, raw_logging: bool = False):
+    """
+    Get the shared chat client for a provider/model pair.
+
+    Clients are cached so agents using the same model reuse one instance and its HTTP connection pool.
+    Fake responses are stored on the chat class, so sharing an instance does not change how they are consumed.
+
+    Args:
+        provider (str): Key into SUPPORTED_MODELS (e.g. "anthropic")
+        model_name (str): The model the client should call
+        raw_logging (bool, optional): Whether the client logs raw requests/responses. Defaults to False.
+
+    Returns:
+        ChatLLM: The chat client instance for this provider and model
+    """
+    chat_class = SUPPORTED_MODELS[provider]["chat_class"]
+    return chat_class(model=model_name, raw_logging=raw_logging)
+
+
+async def close_chat_clients():
+    """
+    Close the HTTP sessions of the shared chat clients and their connection pool. Call on shutdown.
+    """
+    await ChatLLM.close_all()
+
+
 if __name__ == "__main__":
     print(find_supported_model_given_model_name("gpt-4.1"))
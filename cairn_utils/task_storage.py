@@ -1,14 +1,21 @@
-import json
+import asyncio
 import logging
 import sqlite3
 import threading
 import time
 from contextlib import contextmanager
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional
+
+import orjson
 
 logger = logging.getLogger(__name__)
 
 
+def _dumps(data: Any) -> str:
+    """Serialize data for a JSON column. Decoded to str since SQLite's JSON functions reject BLOBs."""
+    return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
 class TaskStorage:
     """SQLite-based storage for task states, replacing in-memory dictionaries"""
 
@@ -72,6 +79,9 @@ class TaskStorage:
         conn = sqlite3.connect(self.db_path, timeout=30)
         conn.row_factory = sqlite3.Row
         conn.execute("PRAGMA journal_mode = WAL")
+        # WAL stays consistent with NORMAL sync; only the last commits can be lost on power failure
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute("PRAGMA temp_store = MEMORY")
         conn.execute("PRAGMA busy_timeout = 5000")
         try:
             yield conn
@@ -91,7 +101,7 @@ class TaskStorage:
                 INSERT OR REPLACE INTO active_tasks (task_id, payload, run_ids, updated_at)
                 VALUES (?, ?, '[]', CURRENT_TIMESTAMP)
             """,
-                (task_id, json.dumps(payload)),
+                (task_id, _dumps(payload)),
             )
         logger.debug(f"Added active task: {task_id}")
 
@@ -104,7 +114,11 @@ class TaskStorage:
             """,
                 (task_id,),
             ).fetchone()
-            return json.loads(row["payload"]) if row else None
+            return orjson.loads(row["payload"]) if row else None
+
+    async def aget_active_task(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """Async get_active_task; the query runs on a worker thread so the event loop isn't blocked"""
+        return await asyncio.to_thread(self.get_active_task, task_id)
 
     def get_all_active_tasks(self) -> Dict[str, Any]:
         """Get all active tasks (mimics the active_tasks dict interface)"""
@@ -112,7 +126,7 @@ class TaskStorage:
             rows = conn.execute("""
                 SELECT task_id, payload FROM active_tasks
             """).fetchall()
-            return {row["task_id"]: json.loads(row["payload"]) for row in rows}
+            return {row["task_id"]: orjson.loads(row["payload"]) for row in rows}
 
     def update_active_task(self, task_id: str, payload: Dict[str, Any]):
         """Update an active task"""
@@ -123,7 +137,7 @@ class TaskStorage:
                 SET payload = ?, updated_at = CURRENT_TIMESTAMP
                 WHERE task_id = ?
             """,
-                (json.dumps(payload), task_id),
+                (_dumps(payload), task_id),
             )
         logger.debug(f"Updated active task: {task_id}")
 
@@ -137,7 +151,7 @@ class TaskStorage:
             ).fetchone()
 
             if row:
-                current_run_ids = json.loads(row["run_ids"])
+                current_run_ids = orjson.loads(row["run_ids"])
                 current_run_ids.append(run_id)
 
                 conn.execute(
@@ -146,7 +160,7 @@ class TaskStorage:
                     SET run_ids = ?, updated_at = CURRENT_TIMESTAMP
                     WHERE task_id = ?
                 """,
-                    (json.dumps(current_run_ids), task_id),
+                    (_dumps(current_run_ids), task_id),
                 )
                 logger.debug(f"Added run_id {run_id} to task {task_id}")
             else:
@@ -159,7 +173,7 @@ class TaskStorage:
                 "SELECT run_ids FROM active_tasks WHERE task_id = ?",
                 (task_id,),
             ).fetchone()
-            return json.loads(row["run_ids"]) if row else []
+            return orjson.loads(row["run_ids"]) if row else []
 
     def remove_active_task(self, task_id: str):
         """Remove a task from active tasks"""
@@ -180,10 +194,29 @@ class TaskStorage:
                 INSERT OR REPLACE INTO task_logs (task_id, run_id, agent_type, log_data, updated_at)
                 VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
             """,
-                (task_id, run_id, agent_type, json.dumps(log_data)),
+                (task_id, run_id, agent_type, _dumps(log_data)),
             )
         logger.debug(f"Saved log for task_id: {task_id}, run_id: {run_id}, agent_type: {agent_type}")
 
+    def append_log_progress(self, task_id: str, run_id: str, agent_type: str, messages: List[Any], last_updated: str):
+        """Append messages to a saved log's progress list in one transaction, without rewriting it from Python"""
+        with self.get_connection() as conn:
+            conn.executemany(
+                """
+                UPDATE task_logs SET log_data = json_insert(log_data, '$.progress[#]', json(?))
+                WHERE run_id = ? AND agent_type = ?
+            """,
+                [(_dumps(message), run_id, agent_type) for message in messages],
+            )
+            conn.execute(
+                """
+                UPDATE task_logs SET log_data = json_set(log_data, '$.last_updated', ?), updated_at = CURRENT_TIMESTAMP
+                WHERE run_id = ? AND agent_type = ?
+            """,
+                (last_updated, run_id, agent_type),
+            )
+        logger.debug(f"Appended {len(messages)} messages to log for task_id: {task_id}, run_id: {run_id}, agent_type: {agent_type}")
+
     def load_log(self, run_id: str, agent_type: str) -> Dict[str, Any]:
         """Load task log data (replaces file-based loading) - returns most recent entry"""
         with self.get_connection() as conn:
@@ -195,7 +228,41 @@ class TaskStorage:
             """,
                 (run_id, agent_type),
             ).fetchone()
-            return json.loads(row["log_data"]) if row else {}
+            return orjson.loads(row["log_data"]) if row else {}
+
+    def load_log_summary(self, run_id: str, agent_type: str) -> Dict[str, Any]:
+        """Get last_updated and the number of progress messages for a log without deserializing it"""
+        with self.get_connection() as conn:
+            row = conn.execute(
+                """
+                SELECT json_extract(log_data, '$.last_updated') AS last_updated,
+                       json_array_length(log_data, '$.progress') AS message_count
+                FROM task_logs
+                WHERE run_id = ? AND agent_type = ?
+                ORDER BY updated_at DESC LIMIT 1
+            """,
+                (run_id, agent_type),
+            ).fetchone()
+            return dict(row) if row else {}
+
+    def iter_log_progress(self, run_id: str, agent_type: str) -> Iterator[Any]:
+        """Yield a log's progress messages one at a time, decoding each row as it is read"""
+        with self.get_connection() as conn:
+            rows = conn.execute(
+                """
+                SELECT progress.value, progress.type
+                FROM (
+                    SELECT log_data FROM task_logs
+                    WHERE run_id = ? AND agent_type = ?
+                    ORDER BY updated_at DESC LIMIT 1
+                ) AS log, json_each(log.log_data, '$.progress') AS progress
+                ORDER BY progress.key
+            """,
+                (run_id, agent_type),
+            )
+            for value, value_type in rows:
+                # Objects and arrays come back as JSON text, scalars as plain SQL values
+                yield orjson.loads(value) if value_type in ("object", "array") else value
 
     def get_all_logs_for_task(self, task_id: str) -> List[Dict[str, Any]]:
         """Get all logs for a specific task (task_id) from the database"""
@@ -214,7 +281,7 @@ class TaskStorage:
                 log_entry = {
                     "run_id": row["run_id"],
                     "agent_type": row["agent_type"],
-                    "log_data": json.loads(row["log_data"]),
+                    "log_data": orjson.loads(row["log_data"]),
                     "created_at": row["created_at"],
                     "updated_at": row["updated_at"]
                 }
@@ -238,7 +305,7 @@ class TaskStorage:
                 log_entry = {
                     "task_id": row["task_id"],
                     "agent_type": row["agent_type"],
-                    "log_data": json.loads(row["log_data"]),
+                    "log_data": orjson.loads(row["log_data"]),
                     "created_at": row["created_at"],
                     "updated_at": row["updated_at"]
                 }
@@ -326,6 +393,10 @@ class TaskStorage:
 
         return generated_ids
 
+    async def apre_generate_subtask_ids(self, fullstack_run_id: str, num_subtasks: int) -> List[Dict[str, Any]]:
+        """Async pre_generate_subtask_ids; the inserts run on a worker thread so the event loop isn't blocked"""
+        return await asyncio.to_thread(self.pre_generate_subtask_ids, fullstack_run_id, num_subtasks)
+
     def get_subtask_ids(self, fullstack_run_id: str) -> List[Dict[str, Any]]:
         """
         Get all pre-generated subtask IDs for a specific Fullstack Planner run.
@@ -14,11 +14,11 @@ import traceback
 from typing import Any, Dict, Optional
 
 from agents.llm_consts import ChatAnthropic
-from fuzzywuzzy import fuzz
+from rapidfuzz import fuzz, utils
 from github_utils import (
     batch_update_files,
     generate_jwt,
-    get_all_file_paths,
+    get_all_file_paths_fast,
     get_default_branch_sha,
     get_directory_structure,
     get_installation_token,
@@ -65,7 +65,7 @@ from tool_related_prompts import (
     REPO_MEMORY_PROMPT_NO_MEM,
     REPO_MEMORY_PROMPT_HAS_MEM,
 )
-from supported_models import SUPPORTED_MODELS, find_supported_model_given_model_name
+from supported_models import SUPPORTED_MODELS, find_supported_model_given_model_name, get_chat_client
 
 class DefaultToolBox:
     """
@@ -213,7 +213,7 @@ class DefaultToolBox:
         async def view_repository_structure(params: dict) -> str:
             params = ViewRepositoryStructureParams(**params)
             max_depth = int(params.max_depth) if params.max_depth else 5
-            file_paths = await get_all_file_paths(
+            file_paths = await get_all_file_paths_fast(
                 self.installation_token,
                 self.owner,
                 self.repo,
@@ -348,8 +348,8 @@ class DefaultToolBox:
                     for i, line in enumerate(lines):
                         # Try different fuzzy matching approaches
                         score1 = fuzz.partial_ratio(search_text, line)
-                        score2 = fuzz.token_sort_ratio(search_text, line)
-                        score3 = fuzz.token_set_ratio(search_text, line)
+                        score2 = fuzz.token_sort_ratio(search_text, line, processor=utils.default_process)
+                        score3 = fuzz.token_set_ratio(search_text, line, processor=utils.default_process)
 
                         # Use the maximum score across different matching methods
                         score = max(score1, score2, score3)
@@ -734,9 +734,7 @@ class DefaultToolBox:
 
                 # find associated LLM client given model name...
                 provider, model_info = find_supported_model_given_model_name(self.model_name)
-                chat_class = model_info['chat_class']
-
-                llm_client = chat_class(model=self.model_name)
+                llm_client = get_chat_client(provider, self.model_name)
 
                 # Format the user message with the original content and edit suggestions
                 user_message = EDIT_FILE_USER_MESSAGE.format(
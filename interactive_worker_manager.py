@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 
 import curses
+import hashlib
 import json
 import logging
 import os
@@ -14,6 +15,7 @@ from typing import List, Optional, Tuple
 from datetime import datetime
 
 from dotenv import load_dotenv
+import orjson
 
 # Add the cairn_utils directory to the Python path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'cairn_utils'))
@@ -63,6 +65,7 @@ class WorkerManager:
         self.log_scroll_pos = 0  # Track log scroll position
         self.running_tasks = {}  # Track worker processes instead of asyncio tasks
         self.task_storage = TaskStorage()
+        self._raw_logs_cache = (None, [])  # ((task_id, content digest), formatted raw_logs_dump lines) of the last repaint
 
         # Load and parse repos.json
         try:
@@ -896,12 +899,28 @@ class WorkerManager:
         raw_logs = task.get("raw_logs_dump", {})
         if raw_logs:
             output_lines.append("=== RAW LOGS DUMP (from payload) ===")
+            # Repaints reuse the last formatting while the content is unchanged; updated_at can't be the key,
+            # as not every payload save bumps it and it only has one-second resolution
             try:
-                formatted_logs = json.dumps(raw_logs, indent=2, ensure_ascii=False)
-                output_lines.extend(formatted_logs.split('\n'))
-            except (TypeError, ValueError):
-                # Fallback if JSON serialization fails
-                output_lines.append(str(raw_logs))
+                content_key = hashlib.blake2b(
+                    orjson.dumps(raw_logs, option=orjson.OPT_NON_STR_KEYS), digest_size=16
+                ).digest()
+            except TypeError:
+                content_key = None  # orjson can't encode it, so format it every time
+            cache_key = (task_id, content_key)
+            if content_key is None or self._raw_logs_cache[0] != cache_key:
+                try:
+                    formatted_logs = orjson.dumps(
+                        raw_logs, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+                    ).decode().split('\n')
+                except TypeError:
+                    try:
+                        formatted_logs = json.dumps(raw_logs, indent=2, ensure_ascii=False).split('\n')
+                    except (TypeError, ValueError):
+                        # Fallback if JSON serialization fails
+                        formatted_logs = [str(raw_logs)]
+                self._raw_logs_cache = (cache_key, formatted_logs)
+            output_lines.extend(self._raw_logs_cache[1])
             output_lines.append("")
 
         # If no output or logs, show a message